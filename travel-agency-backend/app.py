@@ -1,25 +1,50 @@
 # backend/app.py
+import logging
 from flask import Flask
 from config import Config
-from extensions import db, jwt, cors
+from services.db_pool import configure_engines, check_server_timeouts
+from services.routing import replica_router
+from services.json_provider import FastJSONProvider
+from extensions import (
+    db, jwt, cors, tour_search, response_cache, password_hasher, login_limiter, token_blocklist,
+    write_behind, review_aggregates, request_metrics, car_availability,
+    quote_engine, inquiry_rollups, image_proxy, table_versions
+)
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(Config)
+    logging.basicConfig(level=app.config['LOG_LEVEL'], format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    configure_engines(app)
 
     db.init_app(app)
+    replica_router.init_app(app)
     jwt.init_app(app)
+    token_blocklist.init_app(app)
+    jwt.token_in_blocklist_loader(token_blocklist.check)
+    response_cache.init_app(app)
+    table_versions.init_app(app)
+    review_aggregates.init_app(app)
+    inquiry_rollups.init_app(app)
+    password_hasher.init_app(app)
+    login_limiter.init_app(app)
+    write_behind.init_app(app)
+    request_metrics.init_app(app)
+    car_availability.init_app(app)
+    quote_engine.init_app(app)
+    image_proxy.init_app(app)
     cors.init_app(app, supports_credentials=True, resources={
         r"/api/*": {
-            "origins": [
-                "http://localhost:3000",
-                "http://127.0.0.1:3000"
-            ],
+            "origins": app.config['CORS_ORIGINS'],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
             "allow_headers": ["Content-Type", "Authorization"]
         }
     })
 
+    from commands import register_commands
+    register_commands(app)
+
     from routes.tours import tours_bp
     from routes.auth import auth_bp
     from routes.reviews import reviews_bp
@@ -27,6 +52,9 @@ def create_app():
     from routes.insurances import insurance_bp
     from routes.newsletter import newsletter_bp
     from routes.inquiries import inquiries_bp
+    from routes.admin import admin_bp
+    from routes.quotes import quotes_bp
+    from routes.images import images_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(tours_bp, url_prefix='/api/tours')
@@ -35,21 +63,31 @@ def create_app():
     app.register_blueprint(insurance_bp, url_prefix='/api/insurance')
     app.register_blueprint(newsletter_bp, url_prefix='/api/newsletter')
     app.register_blueprint(inquiries_bp, url_prefix='/api/inquiries')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(quotes_bp, url_prefix='/api/quotes')
+    app.register_blueprint(images_bp, url_prefix='/api/images')
 
-    with app.app_context():
-        from models.tour import Tour
-        from models.user import User
-        from models.review import Review
-        from models.car import Car
-        from models.insurance import Insurance
-        from models.newsletter import Newsletter
-        from models.inquiry import Inquiry
-        
-        db.create_all()
+    # otherwise nothing touches the database until the first request (the search index builds on first use)
+    if app.config['AUTO_CREATE_SCHEMA']:
+        with app.app_context():
+            from models.tour import Tour
+            from models.user import User
+            from models.review import Review
+            from models.car import Car
+            from models.car_booking import CarBooking
+            from models.insurance import Insurance
+            from models.newsletter import Newsletter
+            from models.newsletter_interest import NewsletterInterest
+            from models.inquiry import Inquiry
+            from models.inquiry_rollup import InquiryDailyRollup
+            from models.table_version import TableVersion
+            from models.revoked_token import RevokedToken
 
-    return app
+            db.create_all()
+            check_server_timeouts(db)
+            tour_search.rebuild()
 
-app = create_app()
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,24 @@
+# backend/asgi.py - optional async serving mode: uvicorn asgi:app
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+from extensions import write_behind
+from routes.async_catalog import register_async_routes
+from services.asgi_http import AsyncRouter
+from services.async_db import AsyncDatabase
+
+
+def create_asgi_app(flask_app):
+    database = AsyncDatabase()
+    database.init_app(flask_app)
+
+    async def shutdown():
+        await database.dispose()
+        write_behind.shutdown()
+
+    # everything without an async twin runs unchanged on the Flask app in asgiref's thread pool
+    router = AsyncRouter(WsgiToAsgi(flask_app), flask_app.config['CORS_ORIGINS'], shutdown)
+    register_async_routes(router, flask_app, database)
+    return router
+
+
+app = create_asgi_app(create_app())
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, make_app, percentile
+from load_test import RESULTS_DIR, SIZES, git_revision, seed
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def serve(mode, port, threads):
+    sys.path.insert(0, BACKEND_DIR)
+    if mode == 'asgi':
+        import uvicorn
+        from asgi import app
+        uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning')
+    else:
+        from wsgi import app
+        from common import PooledWSGIServer
+        PooledWSGIServer('127.0.0.1', port, app, threads).serve_forever()
+
+
+def start_server(mode, port, threads, env):
+    process = subprocess.Popen(
+        [sys.executable, __file__, '--serve', mode, '--port', str(port), '--server-threads', str(threads)],
+        env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f'{mode} server did not start')
+
+
+async def fetch(port, path, timeout):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+        status = int(response.split(b' ', 2)[1])
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        status = None
+    return status, (time.perf_counter() - started) * 1000
+
+
+async def drive(port, connections, duration, rows, timeout):
+    latencies, failures = [], 0
+    deadline = time.monotonic() + duration
+
+    async def client(index):
+        nonlocal failures
+        rng = random.Random(index)
+        while time.monotonic() < deadline:
+            path = rng.choice([
+                '/api/tours?limit=20',
+                f'/api/tours?limit=20&guests={rng.randint(1, 10)}',
+                f'/api/tours/{rng.randint(1, rows)}',
+                '/api/cars?limit=12',
+            ])
+            status, elapsed = await fetch(port, path, timeout)
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                failures += 1
+
+    await asyncio.gather(*(client(index) for index in range(connections)))
+    return latencies, failures
+
+
+def measure(mode, port, levels, duration, rows, timeout):
+    results = []
+    for connections in levels:
+        latencies, failures = asyncio.run(drive(port, connections, duration, rows, timeout))
+        results.append({
+            'mode': mode,
+            'connections': connections,
+            'ok': len(latencies),
+            'failed': failures,
+            'throughput_rps': round(len(latencies) / duration, 1),
+            'p50_ms': round(percentile(latencies, 0.5), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None
+        })
+        row = results[-1]
+        print(f"{mode:<6}{connections:>8}{row['ok']:>8}{row['failed']:>8}{row['throughput_rps']:>10}"
+              f"{row['p50_ms'] or 0:>10.2f}{row['p99_ms'] or 0:>10.2f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Concurrent-connection capacity of the sync WSGI server versus the ASGI mode (asgi.py). '
+                    'Run against a networked MySQL (--database-url) to see the effect of DB round-trips; '
+                    'on a local SQLite file both modes are CPU bound.'
+    )
+    parser.add_argument('--size', choices=sorted(SIZES), default='1k')
+    parser.add_argument('--database-url')
+    parser.add_argument('--connections', default='8,32,128,512', help='comma separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per level')
+    parser.add_argument('--server-threads', type=int, default=8, help='handler threads of the sync server')
+    parser.add_argument('--timeout', type=float, default=10, help='per-request timeout counted as failure')
+    parser.add_argument('--modes', default='wsgi,asgi')
+    parser.add_argument('--serve', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.server_threads)
+        sys.exit(0)
+
+    # measure database reads, not cached responses
+    os.environ.setdefault('CACHE_BACKEND', 'none')
+    os.environ.setdefault('METRICS_QUERY_THRESHOLD', '1000000')
+    app = make_app(args.database_url)
+    rows = SIZES[args.size]
+    seed(app, rows)
+    env = dict(os.environ, DATABASE_URL=app.config['SQLALCHEMY_DATABASE_URI'])
+
+    levels = [int(level) for level in args.connections.split(',')]
+    print(f"{'mode':<6}{'conns':>8}{'ok':>8}{'failed':>8}{'rps':>10}{'p50':>10}{'p99':>10}")
+    results = []
+    for mode in args.modes.split(','):
+        port = free_port()
+        server = start_server(mode, port, args.server_threads, env)
+        try:
+            results.extend(measure(mode, port, levels, args.duration, rows, args.timeout))
+        finally:
+            server.terminate()
+            server.wait()
+
+    commit, dirty = git_revision()
+    output = os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}-asgi-{args.size}.json")
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump({'commit': commit, 'dirty': dirty, 'size': args.size, 'server_threads': args.server_threads,
+                   'database': env['DATABASE_URL'].split('://', 1)[0], 'results': results}, handle, indent=2)
+    print(f'\nWrote {output}')
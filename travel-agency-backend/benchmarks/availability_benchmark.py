@@ -0,0 +1,70 @@
+import argparse
+import random
+from datetime import date, timedelta
+
+from common import bulk_insert, car_rows, make_app, measure
+
+
+def booking_rows(cars, per_car, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    for car_id in range(1, cars + 1):
+        start = today + timedelta(days=rng.randint(0, 10))
+        for index in range(per_car):
+            days = rng.randint(1, 10)
+            yield {
+                'car_id': car_id,
+                'email': f'driver{car_id}-{index}@example.com',
+                'start_date': start,
+                'end_date': start + timedelta(days=days),
+                'status': 'confirmed' if rng.random() < 0.9 else 'cancelled'
+            }
+            start += timedelta(days=days + rng.randint(0, 5))
+
+
+def sql_available(db, Car, CarBooking, start, end):
+    booked = db.session.query(CarBooking.id).filter(
+        CarBooking.car_id == Car.id,
+        CarBooking.status == 'confirmed',
+        CarBooking.start_date < end,
+        CarBooking.end_date > start
+    ).exists()
+    return [row.id for row in db.session.query(Car.id).filter(Car.is_active == True, ~booked)
+            .order_by(Car.price_per_day, Car.id)]
+
+
+def index_available(db, Car, car_availability, start, end):
+    candidates = [row.id for row in db.session.query(Car.id).filter(Car.is_active == True)
+                  .order_by(Car.price_per_day, Car.id)]
+    return car_availability.free_cars(candidates, start, end)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Date-range availability: SQL overlap subquery versus the in-memory interval index')
+    parser.add_argument('--cars', type=int, default=5000)
+    parser.add_argument('--bookings-per-car', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    from extensions import db, car_availability
+    from models.car import Car
+    from models.car_booking import CarBooking
+
+    with app.app_context():
+        bulk_insert(db, Car, car_rows(args.cars))
+        bulk_insert(db, CarBooking, booking_rows(args.cars, args.bookings_per_car))
+        _, build = measure(car_availability.rebuild, repeat=1)
+        print(f'{args.cars} cars, {args.cars * args.bookings_per_car} bookings (index build {build["mean_ms"]} ms)')
+
+        today = date.today()
+        print(f'{"range":<12}{"sql p50":>10}{"index p50":>12}{"check only":>12}{"free":>8}')
+        for offset, days in [(5, 3), (60, 7), (200, 14), (400, 2)]:
+            start, end = today + timedelta(days=offset), today + timedelta(days=offset + days)
+            sql_ids, sql_time = measure(lambda: sql_available(db, Car, CarBooking, start, end), args.repeat)
+            index_ids, index_time = measure(lambda: index_available(db, Car, car_availability, start, end), args.repeat)
+            candidates = index_available(db, Car, car_availability, date.min, date.min + timedelta(days=1))
+            _, check_time = measure(lambda: car_availability.free_cars(candidates, start, end), args.repeat)
+            assert sql_ids == index_ids
+            print(f'+{offset}d/{days}d{"":<4}{sql_time["p50_ms"]:>8}ms{index_time["p50_ms"]:>10}ms'
+                  f'{check_time["p50_ms"]:>10}ms{len(index_ids):>8}')
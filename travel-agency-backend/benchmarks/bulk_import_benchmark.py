@@ -0,0 +1,53 @@
+import argparse
+import time
+
+from common import make_app, tour_rows
+
+
+def api_items(count):
+    for row in tour_rows(count):
+        yield {
+            'title': row['title'],
+            'description': row['description'],
+            'price': row['price'],
+            'duration': row['duration'],
+            'groupSize': row['group_size'],
+            'location': row['location'],
+            'region': row['region'],
+            'featured': row['is_featured'],
+            'isActive': row['is_active'],
+            'startDate': row['start_date'].isoformat(),
+            'endDate': row['end_date'].isoformat()
+        }
+
+
+def run(count, chunk_size):
+    app = make_app()
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity='benchmark')
+    client = app.test_client()
+    client.set_cookie('access_token_cookie', token)
+    items = list(api_items(count))
+
+    started = time.perf_counter()
+    for item in items:
+        client.post('/api/tours', json=item)
+    per_row = time.perf_counter() - started
+
+    started = time.perf_counter()
+    report = client.post(f'/api/tours/bulk?chunkSize={chunk_size}', json=items).get_json()
+    bulk = time.perf_counter() - started
+
+    print(f'per-row POST /api/tours: {count} rows in {per_row:.2f}s ({count / per_row:,.0f} rows/s)')
+    print(f'POST /api/tours/bulk:    {report["written"]} rows in {bulk:.2f}s ({count / bulk:,.0f} rows/s, '
+          f'chunk size {chunk_size})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare per-row and bulk tour imports')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+    run(args.rows, args.chunk_size)
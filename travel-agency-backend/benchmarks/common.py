@@ -0,0 +1,184 @@
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from werkzeug.serving import BaseWSGIServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+CITIES = [
+    'Kraków', 'Łódź', 'Gdańsk', 'Wrocław', 'Poznań', 'Zakopane', 'Toruń', 'Białystok',
+    'Szczecin', 'Lublin', 'Almería', 'Sevilla', 'Málaga', 'Granada', 'Lisboa', 'Porto',
+    'Reykjavík', 'Zürich', 'Kyoto', 'Bangkok', 'Marrakesh', 'Cusco', 'Hanoi', 'Bali'
+]
+REGIONS = ['europe', 'asia', 'africa', 'america', 'oceania']
+WORDS = [
+    'wycieczka', 'góry', 'jezioro', 'plaża', 'zamek', 'świątynia', 'pustynia', 'rejs',
+    'przygoda', 'kultura', 'wino', 'kuchnia', 'safari', 'trekking', 'nurkowanie', 'miasto',
+    'adventure', 'luxury', 'beach', 'cultural', 'mountains', 'island', 'sunset', 'heritage'
+]
+
+
+def make_app(database_url=None):
+    if database_url is None:
+        handle, path = tempfile.mkstemp(prefix='pinguino-bench-', suffix='.db')
+        os.close(handle)
+        database_url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = database_url
+
+    from app import create_app
+    return create_app()
+
+
+def tour_rows(count, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    for index in range(count):
+        city = rng.choice(CITIES)
+        start = today + timedelta(days=rng.randint(0, 365))
+        days = rng.randint(1, 21)
+        yield {
+            'title': f'{city} {rng.choice(WORDS)} {rng.choice(WORDS)} #{index}',
+            'description': ' '.join(rng.choice(WORDS) for _ in range(20)),
+            'price': round(rng.uniform(100, 5000), 2),
+            'duration': f'{days} days',
+            'group_size': str(rng.randint(2, 40)),
+            'rating': round(rng.uniform(3, 5), 1),
+            'reviews_count': rng.randint(0, 500),
+            'image_url': '',
+            'location': city,
+            'region': rng.choice(REGIONS),
+            'is_featured': rng.random() < 0.05,
+            'start_date': start,
+            'end_date': start + timedelta(days=days),
+            'is_active': rng.random() < 0.9
+        }
+
+
+def car_rows(count, seed=42):
+    rng = random.Random(seed)
+    features = ['AC', 'GPS', 'Bluetooth', 'Cruise control', 'Heated seats', 'Roof rack', '4x4']
+    for index in range(count):
+        yield {
+            'name': f'Car {index}',
+            'category': rng.choice(['economy', 'compact', 'suv', 'luxury', 'van']),
+            'price_per_day': round(rng.uniform(20, 250), 2),
+            'seats': rng.choice([2, 4, 5, 7, 9]),
+            'transmission': rng.choice(['manual', 'automatic']),
+            'image_url': '',
+            'features': ','.join(rng.sample(features, rng.randint(0, len(features)))),
+            'is_active': rng.random() < 0.9
+        }
+
+
+def review_rows(count, seed=42, tour_count=None):
+    rng = random.Random(seed)
+    for index in range(count):
+        yield {
+            'tour_id': rng.randint(1, tour_count) if tour_count else None,
+            'username': f'user{index}',
+            'city': rng.choice(CITIES),
+            'country': 'Polska',
+            'rating': rng.randint(1, 5),
+            'comment': ' '.join(rng.choice(WORDS) for _ in range(15)),
+            'is_active': rng.random() < 0.8
+        }
+
+
+def inquiry_rows(count, seed=42):
+    rng = random.Random(seed)
+    for index in range(count):
+        item_type = rng.choice(['tour', 'car', 'insurance'])
+        yield {
+            'email': f'client{index}@example.com',
+            'item_type': item_type,
+            'item_id': str(rng.randint(1, 500)),
+            'item_title': f'{item_type} {rng.choice(CITIES)}',
+            'status': rng.choice(['new', 'contacted', 'closed']),
+            # two years of history, so date-ranged analytics see realistic selectivity
+            'created_at': datetime.utcnow() - timedelta(minutes=rng.randint(0, 730 * 24 * 60))
+        }
+
+
+def newsletter_rows(count, seed=42):
+    rng = random.Random(seed)
+    interests = ['beach', 'mountains', 'culture', 'adventure', 'cars', 'cruises']
+    for index in range(count):
+        yield {
+            'email': f'reader{index}@example.com',
+            'first_name': f'Reader{index}',
+            'last_name': rng.choice(CITIES),
+            'interests': ','.join(rng.sample(interests, rng.randint(0, 3)))
+        }
+
+
+def bulk_insert(db, model, rows, chunk_size=5000):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(model.__table__.insert(), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(model.__table__.insert(), chunk)
+    db.session.commit()
+
+
+def measure(func, repeat=20):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, {
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3)
+    }
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    # fixed number of handler threads, like a gunicorn deployment with N sync workers
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = dict(headers or {})
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+    started = time.perf_counter()
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    elapsed = (time.perf_counter() - started) * 1000
+    connection.close()
+    return response.status, elapsed, response
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
@@ -0,0 +1,83 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import bulk_insert, make_app
+
+INTERESTS = ['adventure', 'luxury', 'cultural', 'beach', 'city']
+
+
+def newsletter_rows(count):
+    for index in range(count):
+        yield {
+            'email': f'subscriber{index}@example.com',
+            'first_name': f'Jan{index}',
+            'last_name': 'Kowalski',
+            'interests': ','.join(INTERESTS[:index % len(INTERESTS) + 1])
+        }
+
+
+def seed(database_url, rows):
+    app = make_app(database_url)
+    from extensions import db
+    from models.newsletter import Newsletter
+
+    with app.app_context():
+        bulk_insert(db, Newsletter, newsletter_rows(rows), chunk_size=20_000)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export(database_url, export_format, ceiling_mb):
+    app = make_app(database_url)
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity='benchmark')
+
+    client = app.test_client()
+    client.set_cookie('access_token_cookie', token)
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    response = client.get(f'/api/newsletter/export?format={export_format}', buffered=False)
+    exported_bytes, lines = 0, 0
+    for chunk in response.response:
+        exported_bytes += len(chunk)
+        lines += chunk.count(b'\n')
+    response.close()
+    elapsed = time.perf_counter() - started
+    growth = peak_rss_mb() - baseline
+
+    print(f'{export_format}: {lines} lines, {exported_bytes / 1e6:.1f} MB in {elapsed:.1f}s, '
+          f'peak RSS growth {growth:.1f} MB (ceiling {ceiling_mb} MB)')
+    return growth <= ceiling_mb
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that newsletter exports stream with flat memory')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--ceiling-mb', type=float, default=64)
+    parser.add_argument('--seed-only', metavar='DATABASE_URL')
+    args = parser.parse_args()
+
+    if args.seed_only:
+        seed(args.seed_only, args.rows)
+        sys.exit(0)
+
+    handle, path = tempfile.mkstemp(prefix='pinguino-export-', suffix='.db')
+    os.close(handle)
+    database_url = f'sqlite:///{path}'
+    # seed in a child process so its allocations do not count towards our peak RSS
+    subprocess.run([sys.executable, __file__, '--rows', str(args.rows), '--seed-only', database_url], check=True)
+
+    ok = export(database_url, args.format, args.ceiling_mb)
+    os.remove(path)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,130 @@
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+from common import make_app
+
+# local fixtures only: sources are generated into IMAGE_LOCAL_ROOT, nothing is fetched from the network
+
+
+def make_fixtures(root, count):
+    from PIL import Image
+
+    for index in range(count):
+        image = Image.new('RGB', (2400, 1600), (index * 40 % 256, 120, 200 - index * 30 % 200))
+        image.save(os.path.join(root, f'photo{index}.jpg'), quality=90)
+
+
+def check(label, condition, failures):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def image_width(data):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return image.width
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Image proxy checks against local fixtures')
+    parser.add_argument('--fixtures', type=int, default=6)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='pinguino-images-')
+    fixtures, cache_dir = os.path.join(work, 'fixtures'), os.path.join(work, 'cache')
+    os.makedirs(fixtures)
+    make_fixtures(fixtures, args.fixtures)
+    os.environ.update({
+        'IMAGE_PROXY_ENABLED': 'true',
+        'IMAGE_LOCAL_ROOT': fixtures,
+        'IMAGE_CACHE_DIR': cache_dir,
+        'IMAGE_WIDTHS': '320,640,1024',
+        'IMAGE_SIGNING_KEY': 'check-key',
+    })
+
+    app = make_app()
+    from extensions import image_proxy
+    from services.images import DiskLRU, ImageError
+
+    client = app.test_client()
+    failures = []
+
+    def get(src, width=640, image_format='webp', **params):
+        query = {'src': src, 'sig': image_proxy.sign(src), **params}
+        return client.get(f'/api/images/{width}.{image_format}', query_string=query)
+
+    # widths snap up to the configured set and never upscale past it
+    for requested, expected in [(100, 320), (320, 320), (500, 640), (5000, 1024)]:
+        response = get('/photo0.jpg', requested)
+        check(f'width {requested} renders {expected}px',
+              response.status_code == 200 and image_width(response.data) == expected, failures)
+    response = get('/photo0.jpg', 640, 'jpeg')
+    check('jpeg variant', response.status_code == 200 and response.mimetype == 'image/jpeg', failures)
+    check('srcset lists every width', image_proxy.srcset('/photo0.jpg').count('w,') == 2, failures)
+
+    # repeat requests revalidate against the content-keyed etag
+    first = get('/photo1.jpg')
+    again = client.get(first.request.url, headers={'If-None-Match': first.headers['ETag']})
+    check('cached variant answers 304', first.status_code == 200 and again.status_code == 304, failures)
+
+    # signatures
+    response = client.get('/api/images/640.webp', query_string={'src': '/photo0.jpg', 'sig': 'forged'})
+    check('forged signature is 403', response.status_code == 403, failures)
+    response = client.get('/api/images/640.webp', query_string={'src': '/photo0.jpg'})
+    check('missing signature is 403', response.status_code == 403, failures)
+    response = client.get('/api/images/640.webp', query_string={
+        'src': '/photo1.jpg', 'sig': image_proxy.sign('/photo0.jpg')
+    })
+    check('signature of another source is 403', response.status_code == 403, failures)
+
+    # path traversal out of IMAGE_LOCAL_ROOT
+    secret = os.path.join(work, 'secret.jpg')
+    shutil.copy(os.path.join(fixtures, 'photo0.jpg'), secret)
+    for src in ['/../secret.jpg', '/./../secret.jpg', '/sub/../../secret.jpg']:
+        check(f'traversal {src} is 403', get(src).status_code == 403, failures)
+    os.symlink(secret, os.path.join(fixtures, 'link.jpg'))
+    check('symlink out of the root is 403', get('/link.jpg').status_code == 403, failures)
+    check('missing source is 404', get('/nope.jpg').status_code == 404, failures)
+
+    # private and internal addresses are refused before any connection is made
+    for url in ['http://127.0.0.1/a.jpg', 'http://localhost/a.jpg', 'http://10.0.0.5/a.jpg',
+                'http://169.254.169.254/latest/meta-data', 'http://[::1]/a.jpg', 'http://192.168.1.1:8080/a.jpg']:
+        check(f'{url} is 403', get(url).status_code == 403, failures)
+    check('unsupported scheme is 400', get('file:///etc/passwd').status_code == 400, failures)
+
+    # eviction: a cache far smaller than the variants stays near its limit,
+    # with two instances standing in for two workers sharing the directory
+    shared = os.path.join(work, 'shared')
+    workers = [DiskLRU(shared, 200_000), DiskLRU(shared, 200_000)]
+    for index in range(60):
+        workers[index % 2].put(workers[0].path('variants', f'{index:02d}', f'{index}.webp'), os.urandom(20_000))
+    used = workers[0].stats()['bytes']
+    check(f'shared cache stays under its limit ({used} bytes)', used <= 200_000, failures)
+
+    image_proxy.cache = DiskLRU(cache_dir, 1)
+    try:
+        image, mimetype, _ = image_proxy.variant('/photo2.jpg', 320, 'webp')
+        served = image.read()
+        check('a variant evicted on write is still served', image_width(served) == 320, failures)
+        hit, _, _ = image_proxy.variant('/photo2.jpg', 320, 'webp')
+        check('evicted variant is rendered again', image_width(hit.read()) == 320, failures)
+
+        image_proxy.cache = DiskLRU(cache_dir, 10 ** 9)
+        image_proxy.variant('/photo3.jpg', 320, 'webp')
+        hit, _, _ = image_proxy.variant('/photo3.jpg', 320, 'webp')
+        # another worker evicts the whole cache between the lookup and the response
+        shutil.rmtree(os.path.join(cache_dir, 'variants'))
+        check('a cache hit survives eviction before it is sent', image_width(hit.read()) == 320, failures)
+        hit.close()
+    except ImageError as e:
+        check(f'eviction during serve ({e})', False, failures)
+
+    shutil.rmtree(work)
+    print(f'{len(failures)} failed' if failures else 'all checks passed')
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,268 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+
+from common import (
+    BACKEND_DIR, CITIES, WORDS, PooledWSGIServer, bulk_insert, car_rows, inquiry_rows, make_app,
+    newsletter_rows, percentile, request, review_rows, tour_rows
+)
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+ADMIN_USERNAME = 'loadtest-admin'
+ADMIN_PASSWORD = 'loadtest-password'
+_sequence = itertools.count()
+
+
+def homepage(rng):
+    return rng.choice([
+        ('home.featured_tours', 'GET', '/api/tours?featured=true', None),
+        ('home.reviews', 'GET', '/api/reviews', None),
+        ('home.cars', 'GET', '/api/cars?limit=12', None),
+        ('home.insurance', 'GET', '/api/insurance', None),
+    ])
+
+
+def tour_search(rng):
+    start = date.today() + timedelta(days=rng.randint(0, 300))
+    params = {'startDate': start.isoformat(), 'endDate': (start + timedelta(days=30)).isoformat(), 'limit': 50}
+    if rng.random() < 0.5:
+        params['q'] = rng.choice(WORDS + CITIES)
+    if rng.random() < 0.5:
+        params['guests'] = rng.randint(1, 10)
+    return 'search.tours', 'GET', '/api/tours?' + urlencode(params), None
+
+
+def admin_lists(rng):
+    return rng.choice([
+        ('admin.tours', 'GET', '/api/tours?admin=true&limit=50', None),
+        ('admin.reviews', 'GET', '/api/reviews?admin=true&limit=50', None),
+        ('admin.inquiries', 'GET', '/api/inquiries?limit=50', None),
+        ('admin.newsletter', 'GET', '/api/newsletter?limit=50', None),
+    ])
+
+
+def form_posts(rng):
+    number = next(_sequence)
+    if rng.random() < 0.5:
+        return 'forms.inquiry', 'POST', '/api/inquiries', {
+            'email': f'load{number}@example.com', 'type': 'tour', 'id': rng.randint(1, 1000),
+            'itemTitle': f'Tour {rng.choice(CITIES)}'
+        }
+    # every tenth subscription repeats an address to exercise the dedupe path
+    email = f'load{number // 10 * 10 if rng.random() < 0.1 else number}@example.com'
+    return 'forms.subscribe', 'POST', '/api/newsletter/subscribe', {
+        'email': email, 'firstName': 'Load', 'lastName': 'Test', 'interests': ['beach']
+    }
+
+
+def logins(rng):
+    return 'auth.login', 'POST', '/api/auth/login', {'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD}
+
+
+MIXES = {
+    'homepage': [(homepage, 1)],
+    'search': [(tour_search, 1)],
+    'admin': [(admin_lists, 1)],
+    'forms': [(form_posts, 1)],
+    'login': [(logins, 1)],
+    'mixed': [(homepage, 50), (tour_search, 30), (form_posts, 10), (admin_lists, 8), (logins, 2)],
+}
+
+
+def seed(app, rows):
+    from extensions import db
+    from models.car import Car
+    from models.inquiry import Inquiry
+    from models.newsletter import Newsletter
+    from models.review import Review
+    from models.tour import Tour
+    from models.user import User
+    from services.catalog import interest_insert, interest_rows
+    from services.inquiry_rollups import rebuild as rebuild_rollups
+    from services.ratings import reconcile
+
+    with app.app_context():
+        if Tour.query.count() >= rows:
+            print(f'Reusing seeded database ({rows} rows)')
+        else:
+            started = time.perf_counter()
+            bulk_insert(db, Tour, tour_rows(rows))
+            bulk_insert(db, Car, car_rows(max(rows // 10, 100)))
+            bulk_insert(db, Review, review_rows(rows, tour_count=rows))
+            bulk_insert(db, Inquiry, inquiry_rows(rows))
+            bulk_insert(db, Newsletter, newsletter_rows(rows))
+            reconcile(db.session)
+            # bulk inserts bypass the flush listeners, so the derived tables are filled here
+            rebuild_rollups(db.session)
+            links = interest_rows(db.session.query(Newsletter.id, Newsletter.interests))
+            for start in range(0, len(links), 5000):
+                db.session.execute(interest_insert(), links[start:start + 5000])
+            db.session.commit()
+            # InnoDB keeps index statistics on its own; SQLite plans without them until ANALYZE runs
+            if db.engine.dialect.name == 'sqlite':
+                db.session.execute(db.text('ANALYZE'))
+                db.session.commit()
+            print(f'Seeded {rows} rows per table in {time.perf_counter() - started:.1f} s')
+
+        if User.query.filter_by(username=ADMIN_USERNAME).first() is None:
+            user = User(username=ADMIN_USERNAME)
+            user.set_password(ADMIN_PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+        from extensions import tour_search
+        tour_search.rebuild()
+
+
+def login_cookie(port):
+    status, _, response = request(port, 'POST', '/api/auth/login', {'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD})
+    if status != 200:
+        raise SystemExit(f'Admin login failed with {status}')
+    for header in response.msg.get_all('Set-Cookie'):
+        if header.startswith('access_token_cookie='):
+            return header.split(';', 1)[0]
+    raise SystemExit('Login did not set an access cookie')
+
+
+def drive(port, mix, duration, concurrency, warmup, seed_value):
+    generators, weights = zip(*MIXES[mix])
+    cookie = {'Cookie': login_cookie(port)}
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    measuring_from = time.monotonic() + warmup
+    deadline = measuring_from + duration
+
+    def worker(index):
+        rng = random.Random(seed_value + index)
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            name, method, path, body = rng.choices(generators, weights)[0](rng)
+            status, elapsed, _ = request(port, method, path, body, cookie)
+            if now < measuring_from:
+                continue
+            with lock:
+                samples[name].append(elapsed)
+                if status >= 400:
+                    errors[name] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors
+
+
+def summarize(latencies, error_count, duration):
+    return {
+        'requests': len(latencies),
+        'errors': error_count,
+        'throughput_rps': round(len(latencies) / duration, 2),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(max(latencies), 2)
+    }
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    return git('rev-parse', '--short', 'HEAD') or 'unknown', bool(git('status', '--porcelain', '--untracked-files=no'))
+
+
+def compare(result, baseline_path, tolerance):
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)
+
+    regressions = []
+    print(f"\nAgainst {baseline['commit']} ({baseline_path}):")
+    for name, current in result['operations'].items():
+        previous = baseline['operations'].get(name)
+        if previous is None:
+            continue
+        ratio = current['p95_ms'] / previous['p95_ms'] if previous['p95_ms'] else 1.0
+        flag = ''
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<22} p95 {previous['p95_ms']:>9.2f} -> {current['p95_ms']:>9.2f} ms ({ratio:5.2f}x)"
+              f"  rps {previous['throughput_rps']:>8.1f} -> {current['throughput_rps']:>8.1f}{flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Drive a traffic mix against a seeded app and record latency percentiles')
+    parser.add_argument('--size', choices=sorted(SIZES), default='1k', help='rows per seeded table')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--server-threads', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='defaults to a fresh SQLite file; an already seeded database is reused')
+    parser.add_argument('--output', help=f'result file (default {RESULTS_DIR}/<commit>-<mix>-<size>.json)')
+    parser.add_argument('--baseline', help='earlier result file to compare p95 latency against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 slowdown before failing')
+    args = parser.parse_args()
+
+    # measure the application, not the abuse limits
+    for name in ('LOGIN_USER_BURST', 'LOGIN_USER_PER_MINUTE', 'LOGIN_IP_BURST', 'LOGIN_IP_PER_MINUTE'):
+        os.environ.setdefault(name, '1000000000')
+    os.environ.setdefault('METRICS_QUERY_THRESHOLD', '1000000')
+
+    app = make_app(args.database_url)
+    rows = SIZES[args.size]
+    seed(app, rows)
+
+    server = PooledWSGIServer('127.0.0.1', 0, app, args.server_threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        samples, errors = drive(server.server_port, args.mix, args.duration, args.concurrency, args.warmup, args.seed)
+    finally:
+        server.shutdown()
+
+    commit, dirty = git_revision()
+    every = [latency for latencies in samples.values() for latency in latencies]
+    result = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split('://', 1)[0],
+        'size': args.size,
+        'mix': args.mix,
+        'duration_s': args.duration,
+        'concurrency': args.concurrency,
+        'server_threads': args.server_threads,
+        'cache_backend': app.config['CACHE_BACKEND'],
+        'overall': summarize(every, sum(errors.values()), args.duration),
+        'operations': {name: summarize(latencies, errors[name], args.duration) for name, latencies in sorted(samples.items())}
+    }
+
+    print(f"{'operation':<22}{'requests':>10}{'errors':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, summary in [*result['operations'].items(), ('overall', result['overall'])]:
+        print(f"{name:<22}{summary['requests']:>10}{summary['errors']:>8}{summary['throughput_rps']:>10.1f}"
+              f"{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}-{args.mix}-{args.size}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(result, handle, indent=2)
+    print(f'\nWrote {output}')
+
+    if args.baseline and compare(result, args.baseline, args.tolerance):
+        sys.exit(1)
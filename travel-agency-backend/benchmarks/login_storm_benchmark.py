@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import PooledWSGIServer, bulk_insert, car_rows, make_app, percentile, request
+
+
+def serve_and_measure(duration, storm_threads, server_threads):
+    app = make_app()
+    from extensions import db
+    from models.car import Car
+    from models.user import User
+
+    with app.app_context():
+        bulk_insert(db, Car, car_rows(200))
+        user = User(username='admin')
+        user.set_password('correct horse')
+        db.session.add(user)
+        db.session.commit()
+
+    server = PooledWSGIServer('127.0.0.1', 0, app, server_threads)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    login_statuses = []
+
+    def storm():
+        while not stop.is_set():
+            status, _, _ = request(port, 'POST', '/api/auth/login', {'username': 'admin', 'password': 'wrong'})
+            login_statuses.append(status)
+
+    stormers = [threading.Thread(target=storm, daemon=True) for _ in range(storm_threads)]
+    for thread in stormers:
+        thread.start()
+
+    latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        latencies.append(request(port, 'GET', '/api/cars')[1])
+
+    stop.set()
+    for thread in stormers:
+        thread.join()
+    server.shutdown()
+
+    return {
+        'catalog_requests': len(latencies),
+        'catalog_p50_ms': round(statistics.median(latencies), 2),
+        'catalog_p99_ms': round(percentile(latencies, 0.99), 2),
+        'logins': len(login_statuses),
+        'logins_rejected_busy': login_statuses.count(503)
+    }
+
+
+def run_child(mode, duration, storm_threads, server_threads):
+    env = dict(os.environ)
+    env.update({
+        'CACHE_BACKEND': 'none',
+        'LOGIN_IP_BURST': '1000000',
+        'LOGIN_IP_PER_MINUTE': '1000000',
+        'LOGIN_USER_BURST': '1000000',
+        'LOGIN_USER_PER_MINUTE': '1000000',
+        'PASSWORD_HASH_WORKERS': '0' if mode == 'inline' else env.get('PASSWORD_HASH_WORKERS', '2')
+    })
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', '--duration', str(duration),
+         '--storm-threads', str(0 if mode == 'idle' else storm_threads), '--server-threads', str(server_threads)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Catalog latency while the login endpoint is under a storm')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--storm-threads', type=int, default=16)
+    parser.add_argument('--server-threads', type=int, default=8)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(serve_and_measure(args.duration, args.storm_threads, args.server_threads)))
+        sys.exit(0)
+
+    for mode in ('idle', 'inline', 'pool'):
+        result = run_child(mode, args.duration, args.storm_threads, args.server_threads)
+        print(f'{mode:<8}' + '  '.join(f'{key}={value}' for key, value in result.items()))
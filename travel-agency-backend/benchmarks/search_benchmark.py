@@ -0,0 +1,45 @@
+import argparse
+
+from common import bulk_insert, make_app, measure, tour_rows
+
+QUERIES = ['krakow', 'Łódź', 'gdan', 'zamek', 'plaza wino', 'almeria beach']
+
+
+def ilike_search(db, Tour, text):
+    term = f'%{text}%'
+    return [
+        row.id for row in db.session.query(Tour.id).filter(
+            db.or_(Tour.title.ilike(term), Tour.location.ilike(term))
+        )
+    ]
+
+
+def run(sizes, repeat):
+    app = make_app()
+    from extensions import db, tour_search
+    from models.tour import Tour
+
+    with app.app_context():
+        seeded = 0
+        for size in sizes:
+            bulk_insert(db, Tour, tour_rows(size - seeded, seed=size))
+            seeded = size
+
+            _, build = measure(tour_search.rebuild, repeat=1)
+            print(f'\n{size} tours (index build {build["mean_ms"]} ms)')
+            print(f'{"query":<16}{"ilike p50":>12}{"index p50":>12}{"ilike hits":>12}{"index hits":>12}')
+            for text in QUERIES:
+                ilike_ids, ilike_time = measure(lambda: ilike_search(db, Tour, text), repeat)
+                index_ids, index_time = measure(lambda: tour_search.search(text), repeat)
+                print(
+                    f'{text:<16}{ilike_time["p50_ms"]:>10}ms{index_time["p50_ms"]:>10}ms'
+                    f'{len(ilike_ids):>12}{len(index_ids):>12}'
+                )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare ILIKE scans with the in-memory tour search index')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    run(sorted(args.sizes), args.repeat)
@@ -0,0 +1,52 @@
+import argparse
+import json
+
+from common import bulk_insert, car_rows, inquiry_rows, make_app, measure, review_rows, tour_rows
+
+
+def run(rows, repeat):
+    app = make_app()
+    from flask.json.provider import DefaultJSONProvider
+    from extensions import db
+    from models.car import Car
+    from models.inquiry import Inquiry
+    from models.review import Review
+    from models.tour import Tour
+    from services.json_provider import FastJSONProvider
+    from utils.serialization import serialize_query
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    cases = [(Tour, tour_rows), (Car, car_rows), (Review, review_rows), (Inquiry, inquiry_rows)]
+
+    with app.app_context():
+        print(f'{rows} rows per model, json backend: {fast.backend}')
+        print(f'{"model":<10}{"orm+to_dict+json":>20}{"rows+json":>14}{"rows+fast":>14}{"bytes":>12}')
+        for model, generate in cases:
+            bulk_insert(db, model, generate(rows))
+            query = model.query.order_by(model.id)
+
+            def legacy():
+                return stdlib.response([item.to_dict() for item in query.all()]).get_data()
+
+            def row_path():
+                return stdlib.response(serialize_query(query, model)).get_data()
+
+            def fast_path():
+                return fast.response(serialize_query(query, model)).get_data()
+
+            legacy_body, legacy_time = measure(legacy, repeat)
+            row_body, row_time = measure(row_path, repeat)
+            fast_body, fast_time = measure(fast_path, repeat)
+            assert json.loads(legacy_body) == json.loads(row_body) == json.loads(fast_body)
+
+            print(f'{model.__name__:<10}{legacy_time["p50_ms"]:>18}ms{row_time["p50_ms"]:>12}ms'
+                  f'{fast_time["p50_ms"]:>12}ms{len(fast_body):>12}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serialization cost of list endpoints')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,76 @@
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, cast, text
+
+from common import bulk_insert, make_app, measure, tour_rows
+
+NEW_INDEXES = ('ix_tours_active_dates_capacity', 'ix_tours_active_featured')
+
+
+def explain(db, statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN'
+    return [' | '.join(str(value) for value in row) for row in db.session.execute(text(f'{prefix} {sql}'))]
+
+
+def legacy_query(db, Tour, start, end, guests):
+    return db.select(Tour.__table__).filter(
+        Tour.is_active == True,
+        Tour.start_date >= start,
+        Tour.end_date <= end,
+        cast(Tour.group_size, Integer) >= guests
+    ).order_by(Tour.start_date.asc())
+
+
+def indexed_query(db, Tour, start, end, guests):
+    return db.select(Tour.__table__).filter(
+        Tour.is_active == True,
+        Tour.start_date >= start,
+        Tour.end_date <= end,
+        Tour.capacity >= guests
+    ).order_by(Tour.start_date.asc())
+
+
+def report(db, label, statement, repeat):
+    rows, timing = measure(lambda: db.session.execute(statement).all(), repeat)
+    print(f'\n{label}: {len(rows)} rows, p50 {timing["p50_ms"]} ms, max {timing["max_ms"]} ms')
+    for line in explain(db, statement):
+        print(f'    {line}')
+
+
+def run(size, window_days, repeat):
+    app = make_app()
+    from extensions import db
+    from models.tour import Tour, parse_capacity, parse_duration_days
+
+    with app.app_context():
+        rows = []
+        for row in tour_rows(size):
+            row['capacity'] = parse_capacity(row['group_size'])
+            row['duration_days'] = parse_duration_days(row['duration'])
+            rows.append(row)
+        bulk_insert(db, Tour, rows)
+
+        start = date.today() + timedelta(days=30)
+        end = start + timedelta(days=window_days)
+        guests = 12
+
+        for index in Tour.__table__.indexes:
+            index.drop(db.engine)
+        report(db, 'before (cast(group_size), no index)', legacy_query(db, Tour, start, end, guests), repeat)
+
+        for index in Tour.__table__.indexes:
+            if index.name in NEW_INDEXES:
+                index.create(db.engine)
+        db.session.execute(text('ANALYZE'))
+        report(db, 'after (capacity, composite index)', indexed_query(db, Tour, start, end, guests), repeat)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Query plans and latency of the tour date/guest filter')
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--window-days', type=int, default=14)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    run(args.size, args.window_days, args.repeat)
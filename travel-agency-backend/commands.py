@@ -0,0 +1,228 @@
+import os
+import click
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from extensions import db
+from services.db_pool import check_server_timeouts
+
+
+def add_missing_columns():
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {preparer.quote(table.name)} ADD COLUMN {ddl}'))
+            added.append(f'{table.name}.{column.name}')
+
+    return added
+
+
+def create_missing_indexes():
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspect(db.engine).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+    return created
+
+
+def register_commands(app):
+    @app.cli.command('upgrade-schema')
+    def upgrade_schema():
+        """Create missing tables, columns and indexes declared on the models."""
+        db.create_all()
+        for column in add_missing_columns():
+            click.echo(f'Added column {column}')
+        for index in create_missing_indexes():
+            click.echo(f'Created index {index}')
+        check_server_timeouts(db)
+        click.echo('Schema is up to date')
+
+    @app.cli.command('create-replica-schema')
+    def create_replica_schema():
+        """Create tables on replica binds (only for local stand-in databases)."""
+        for bind_key, engine in db.engines.items():
+            if bind_key and bind_key.startswith('replica_'):
+                db.metadata.create_all(engine)
+                click.echo(f'Created tables on {bind_key}')
+
+    @app.cli.command('backfill-tours')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def backfill_tours(batch_size):
+        """Fill capacity and duration_days from the free-text group_size and duration."""
+        from models.tour import Tour, parse_capacity, parse_duration_days
+
+        last_id, updated = 0, 0
+        while True:
+            rows = db.session.query(Tour.id, Tour.group_size, Tour.duration).filter(
+                Tour.id > last_id,
+                db.or_(Tour.capacity.is_(None), Tour.duration_days.is_(None))
+            ).order_by(Tour.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            db.session.execute(db.update(Tour), [
+                {
+                    'id': row.id,
+                    'capacity': parse_capacity(row.group_size),
+                    'duration_days': parse_duration_days(row.duration)
+                }
+                for row in rows
+            ])
+            db.session.commit()
+            last_id = rows[-1].id
+            updated += len(rows)
+
+        click.echo(f'Backfilled {updated} tours')
+
+    @app.cli.command('reconcile-ratings')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def reconcile_ratings(batch_size):
+        """Recompute tour rating aggregates from active reviews and fix any drift."""
+        from services.ratings import reconcile
+
+        fixed = reconcile(db.session, batch_size)
+        db.session.commit()
+        click.echo(f'Fixed rating aggregates on {fixed} tours')
+
+    @app.cli.command('rebuild-inquiry-rollups')
+    def rebuild_inquiry_rollups():
+        """Recount the daily inquiry rollups from the inquiry table (backfill or drift repair)."""
+        from services.inquiry_rollups import rebuild
+
+        rows = rebuild(db.session)
+        db.session.commit()
+        click.echo(f'Rebuilt {rows} rollup rows')
+
+    @app.cli.command('migrate-interests')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def migrate_interests(batch_size):
+        """Copy the comma-joined newsletter interests into the indexed newsletter_interest table."""
+        from models.newsletter import Newsletter
+        from services.catalog import interest_insert, interest_list, interest_rows
+
+        last_id, subscribers, links = 0, 0, 0
+        while True:
+            rows = db.session.query(Newsletter.id, Newsletter.interests).filter(
+                Newsletter.id > last_id
+            ).order_by(Newsletter.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            # the same spelling rules as new subscriptions; rows already copied are skipped by the primary key
+            normalized = [(row.id, ','.join(interest_list((row.interests or '').split(',')))) for row in rows]
+            changed = [
+                {'id': subscriber_id, 'interests': interests}
+                for (subscriber_id, interests), row in zip(normalized, rows) if interests != (row.interests or '')
+            ]
+            if changed:
+                db.session.execute(db.update(Newsletter), changed)
+            batch = interest_rows(normalized)
+            if batch:
+                db.session.execute(interest_insert(), batch)
+            db.session.commit()
+
+            last_id = rows[-1].id
+            subscribers += len(rows)
+            links += len(batch)
+            click.echo(f'{subscribers} subscribers migrated')
+
+        click.echo(f'Migrated {links} interests of {subscribers} subscribers')
+
+    @app.cli.command('audit-queries')
+    @click.option('--baseline', default=os.path.join(os.path.dirname(__file__), 'query_audit_baseline.json'),
+                  show_default=True, help='accepted findings per dialect')
+    @click.option('--update-baseline', is_flag=True, help='accept the current findings')
+    @click.option('--verbose', is_flag=True, help='print every plan')
+    def audit_queries(baseline, update_baseline, verbose):
+        """EXPLAIN each route's queries; fail on full scans, filesorts or temporary tables not in the baseline."""
+        from services.query_audit import PLAN_READERS, audit, load_baseline, regressions, save_baseline
+
+        dialect = db.engine.dialect.name
+        if dialect not in PLAN_READERS:
+            raise click.ClickException(f"No plan reader for {dialect}, the audit supports {', '.join(PLAN_READERS)}")
+        with db.engine.connect() as connection:
+            results = audit(connection)
+
+        # MySQL picks plans from table statistics, so near-empty tables say little about production
+        if dialect == 'mysql':
+            for table in db.metadata.sorted_tables:
+                with db.engine.connect() as connection:
+                    rows = connection.execute(text(f'SELECT COUNT(*) FROM {table.name}')).scalar()
+                if rows < 1000:
+                    click.echo(f'warning: {table.name} has {rows} rows, seed it (benchmarks/load_test.py) '
+                               f'for representative plans', err=True)
+
+        if update_baseline:
+            save_baseline(baseline, dialect, results)
+            click.echo(f'Baseline for {dialect} written to {baseline}')
+            return
+
+        accepted = load_baseline(baseline, dialect)
+        failed = dict(regressions(results, accepted))
+        for result in results:
+            status = 'REGRESSED' if result['key'] in failed else ('known' if result['issues'] else 'ok')
+            click.echo(f"{status:<10}{result['key']:<50}{', '.join(result['issues'])}")
+            if verbose or result['key'] in failed:
+                for line in result['plan']:
+                    click.echo(f'{"":<12}{line}')
+
+        if failed:
+            raise click.ClickException(f'{len(failed)} queries regressed against the {dialect} baseline')
+        click.echo(f'{len(results)} queries checked, no regressions')
+
+    def run_import(importer, path, chunk_size):
+        from services.bulk_import import ImportPayloadError, read_items
+
+        with open(path, encoding='utf-8-sig') as handle:
+            content = handle.read()
+        try:
+            items = read_items(content, 'csv' if path.lower().endswith('.csv') else 'json')
+        except ImportPayloadError as e:
+            raise click.ClickException(str(e))
+
+        report = importer(items, chunk_size)
+        for error in report['errors']:
+            click.echo(f"Row {error['row']}: {error['error']}", err=True)
+        click.echo(f"Imported {report['written']} of {report['processed']} rows ({report['failed']} failed)")
+
+    @app.cli.command('import-tours')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--chunk-size', type=int, default=lambda: app.config['IMPORT_CHUNK_SIZE'], show_default='IMPORT_CHUNK_SIZE')
+    def import_tours_command(path, chunk_size):
+        """Insert or update tours from a JSON array or CSV file."""
+        from services.bulk_import import import_tours
+        run_import(import_tours, path, chunk_size)
+
+    @app.cli.command('import-cars')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--chunk-size', type=int, default=lambda: app.config['IMPORT_CHUNK_SIZE'], show_default='IMPORT_CHUNK_SIZE')
+    def import_cars_command(path, chunk_size):
+        """Insert or update cars from a JSON array or CSV file."""
+        from services.bulk_import import import_cars
+        run_import(import_cars, path, chunk_size)
+
+    @app.cli.command('replay-spool')
+    def replay_spool():
+        """Write form submissions left in the write-behind spool by a stopped worker."""
+        from extensions import write_behind
+
+        write_behind.start()
+        write_behind.shutdown()
+        stats = write_behind.stats()
+        if stats['pending']:
+            raise click.ClickException(f"{stats['pending']} spooled writes could not be flushed")
+        if stats['deadLettered']:
+            click.echo(f"{stats['deadLettered']} rows were rejected and moved to the dead-letter file", err=True)
+        click.echo(f"Replayed {stats['flushed']} spooled writes")
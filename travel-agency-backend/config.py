@@ -9,16 +9,103 @@ class Config:
     DB_PASSWORD = os.getenv('DB_PASSWORD')
     DB_HOST = os.getenv('DB_HOST')
     DB_NAME = os.getenv('DB_NAME')
+    DATABASE_URL = os.getenv('DATABASE_URL')
 
-    if not all([DB_USER, DB_PASSWORD, DB_HOST, DB_NAME]):
+    if not DATABASE_URL and not all([DB_USER, DB_PASSWORD, DB_HOST, DB_NAME]):
         raise ValueError("Brak konfiguracji bazy danych w pliku .env!")
 
-    SQLALCHEMY_DATABASE_URI = f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}?charset=utf8mb4'
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL or f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}?charset=utf8mb4'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # production skips create_all and all other startup queries; run `flask upgrade-schema` on deploy instead
+    APP_ENV = os.getenv('APP_ENV', 'development')
+    AUTO_CREATE_SCHEMA = (os.getenv('AUTO_CREATE_SCHEMA') or ('false' if APP_ENV == 'production' else 'true')).lower() == 'true'
+
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 280))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    DB_REPLICA_HOSTS = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+    DB_REPLICA_URLS = [url.strip() for url in os.getenv('DB_REPLICA_URLS', '').split(',') if url.strip()] or [
+        f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{host}/{DB_NAME}?charset=utf8mb4' for host in DB_REPLICA_HOSTS
+    ]
+    DB_REPLICA_STRATEGY = os.getenv('DB_REPLICA_STRATEGY', 'round_robin')
+
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default-dev-key')
     JWT_TOKEN_LOCATION = ["cookies"]
     JWT_COOKIE_SECURE = False 
     JWT_COOKIE_CSRF_PROTECT = False
     JWT_COOKIE_SAMESITE = 'Lax'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_DAYS', 30)))
+    JWT_REFRESH_COOKIE_PATH = '/api/auth'
+    JWT_VERIFIED_CACHE_SIZE = int(os.getenv('JWT_VERIFIED_CACHE_SIZE', 10000))
+    JWT_BLOCKLIST_CAPACITY = int(os.getenv('JWT_BLOCKLIST_CAPACITY', 100000))
+    JWT_BLOCKLIST_ERROR_RATE = float(os.getenv('JWT_BLOCKLIST_ERROR_RATE', 0.01))
+
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 2))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+
+    LOGIN_USER_BURST = int(os.getenv('LOGIN_USER_BURST', 5))
+    LOGIN_USER_PER_MINUTE = float(os.getenv('LOGIN_USER_PER_MINUTE', 5))
+    LOGIN_IP_BURST = int(os.getenv('LOGIN_IP_BURST', 20))
+    LOGIN_IP_PER_MINUTE = float(os.getenv('LOGIN_IP_PER_MINUTE', 30))
+
+    DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 500))
+    # best ranked tours a text search pages through; a one-letter prefix would otherwise match the whole table
+    SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 500))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'lru')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+    WRITE_BEHIND_FLUSH_MS = int(os.getenv('WRITE_BEHIND_FLUSH_MS', 200))
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 500))
+    WRITE_BEHIND_SPOOL_DIR = os.getenv('WRITE_BEHIND_SPOOL_DIR') or os.path.join(os.path.dirname(__file__), 'spool')
+    WRITE_BEHIND_FSYNC = os.getenv('WRITE_BEHIND_FSYNC', 'false').lower() == 'true'
+
+    # how often a worker re-reads recently changed bookings written by other workers
+    AVAILABILITY_SYNC_SECONDS = float(os.getenv('AVAILABILITY_SYNC_SECONDS', 2))
+
+    # MM-DD:MM-DD:multiplier periods applied per rented day to car and insurance rates
+    QUOTE_SEASONS = os.getenv('QUOTE_SEASONS', '06-15:08-31:1.25,12-20:01-06:1.15')
+    QUOTE_MAX_COMBINATIONS = int(os.getenv('QUOTE_MAX_COMBINATIONS', 1000))
+    QUOTE_MAX_DAYS = int(os.getenv('QUOTE_MAX_DAYS', 365))
+
+    # resized variants of tour / car / insurance images, see services/images.py (Pillow is optional)
+    IMAGE_PROXY_ENABLED = os.getenv('IMAGE_PROXY_ENABLED', 'true').lower() == 'true'
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR') or os.path.join(os.path.dirname(__file__), 'image_cache')
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    IMAGE_WIDTHS = [int(width) for width in os.getenv('IMAGE_WIDTHS', '320,640,1024,1600').split(',') if width.strip()]
+    IMAGE_DEFAULT_WIDTH = int(os.getenv('IMAGE_DEFAULT_WIDTH', 640))
+    IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'webp')
+    IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+    IMAGE_FETCH_TIMEOUT = float(os.getenv('IMAGE_FETCH_TIMEOUT', 5))
+    IMAGE_MAX_SOURCE_BYTES = int(os.getenv('IMAGE_MAX_SOURCE_BYTES', 15 * 1024 * 1024))
+    IMAGE_SOURCE_TTL = int(os.getenv('IMAGE_SOURCE_TTL', 86400))
+    IMAGE_LOCAL_ROOT = os.getenv('IMAGE_LOCAL_ROOT') or None
+    IMAGE_ALLOWED_HOSTS = [host.strip() for host in os.getenv('IMAGE_ALLOWED_HOSTS', '').split(',') if host.strip()]
+    IMAGE_PUBLIC_URL = os.getenv('IMAGE_PUBLIC_URL', '')
+    IMAGE_SIGNING_KEY = os.getenv('IMAGE_SIGNING_KEY') or None
+
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_QUERY_THRESHOLD = int(os.getenv('METRICS_QUERY_THRESHOLD', 20))
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_SLOW_MS = int(os.getenv('PROFILE_SLOW_MS', 500))
+    PROFILE_DIR = os.getenv('PROFILE_DIR') or os.path.join(os.path.dirname(__file__), 'profiles')
+
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv(
+        'CORS_ORIGINS', 'http://localhost:3000,http://127.0.0.1:3000'
+    ).split(',') if origin.strip()]
+    # ASGI mode only (asgi.py): asyncmy (default) or aiomysql for MySQL
+    ASYNC_DB_DRIVER = os.getenv('ASYNC_DB_DRIVER') or None
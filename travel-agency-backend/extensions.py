@@ -1,7 +1,35 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from services.search import TourSearchIndex
+from services.cache import ResponseCache
+from services.routing import RoutingSession
+from services.hashing import PasswordHasher
+from services.rate_limit import LoginRateLimiter
+from services.tokens import CachingJWTManager, TokenBlocklist
+from services.write_behind import WriteBehindQueue
+from services.ratings import ReviewAggregates
+from services.metrics import RequestMetrics
+from services.availability import CarAvailabilityIndex
+from services.quotes import QuoteEngine
+from services.car_facets import CarFacetIndex
+from services.inquiry_rollups import InquiryRollups
+from services.images import ImageProxy
+from services.table_versions import TableVersions
 
-db = SQLAlchemy()
-jwt = JWTManager()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = CachingJWTManager()
 cors = CORS()
+tour_search = TourSearchIndex()
+response_cache = ResponseCache()
+password_hasher = PasswordHasher()
+login_limiter = LoginRateLimiter()
+token_blocklist = TokenBlocklist()
+write_behind = WriteBehindQueue()
+review_aggregates = ReviewAggregates()
+request_metrics = RequestMetrics()
+car_availability = CarAvailabilityIndex()
+quote_engine = QuoteEngine()
+car_facets = CarFacetIndex()
+inquiry_rollups = InquiryRollups()
+image_proxy = ImageProxy()
+table_versions = TableVersions()
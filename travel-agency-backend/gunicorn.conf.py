@@ -0,0 +1,18 @@
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+# import and configure the app once in the master, workers start as copy-on-write forks
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+raw_env = ['APP_ENV=' + os.getenv('APP_ENV', 'production')]
+
+
+def post_fork(server, worker):
+    # connections opened in the master (e.g. by a warm-up) must not be shared between workers
+    from extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -1,7 +1,14 @@
-from extensions import db
+from extensions import db, image_proxy
 from datetime import datetime
+from models.columns import updated_at_column
+from utils.serialization import serialize, split_list
 
 class Car(db.Model):
+    __table_args__ = (
+        db.Index('ix_car_active_price', 'is_active', 'price_per_day'),
+        db.Index('ix_car_price', 'price_per_day'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50), nullable=False)
@@ -11,17 +18,24 @@ class Car(db.Model):
     image_url = db.Column(db.String(500), nullable=True)
     features = db.Column(db.Text, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
+    # bumped by every booking attempt; the UPDATE holds the row lock that serializes bookings per car
+    booking_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = updated_at_column()
+
+    API_FIELDS = {
+        'id': ('id', None),
+        'name': ('name', None),
+        'category': ('category', None),
+        'price': ('price_per_day', None),
+        'seats': ('seats', None),
+        'transmission': ('transmission', None),
+        'image': ('image_url', None),
+        'imageSrc': ('image_url', image_proxy.src),
+        'imageSrcset': ('image_url', image_proxy.srcset),
+        'features': ('features', split_list),
+        'isActive': ('is_active', None)
+    }
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'category': self.category,
-            'price': self.price_per_day,
-            'seats': self.seats,
-            'transmission': self.transmission,
-            'image': self.image_url,
-            'features': self.features.split(',') if self.features else [],
-            'isActive': self.is_active
-        }
+        return serialize(self, self.API_FIELDS)
@@ -0,0 +1,34 @@
+from extensions import db
+from datetime import datetime
+from models.columns import updated_at_column
+from utils.serialization import serialize, iso_format, minute_format
+
+class CarBooking(db.Model):
+    __tablename__ = 'car_booking'
+    __table_args__ = (
+        db.Index('ix_car_booking_car_status_dates', 'car_id', 'status', 'start_date', 'end_date'),
+        db.Index('ix_car_booking_start', 'start_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    car_id = db.Column(db.Integer, db.ForeignKey('car.id', ondelete='CASCADE'), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    # half-open [start_date, end_date): the car is free again on end_date
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='confirmed')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = updated_at_column()
+
+    API_FIELDS = {
+        'id': ('id', None),
+        'carId': ('car_id', None),
+        'email': ('email', None),
+        'startDate': ('start_date', iso_format),
+        'endDate': ('end_date', iso_format),
+        'status': ('status', None),
+        'createdAt': ('created_at', minute_format)
+    }
+
+    def to_dict(self):
+        return serialize(self, self.API_FIELDS)
@@ -0,0 +1,10 @@
+from datetime import datetime
+from sqlalchemy.dialects import mysql
+from extensions import db
+
+# MySQL DATETIME keeps whole seconds by default, too coarse for version stamps
+PreciseDateTime = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def updated_at_column():
+    return db.Column(PreciseDateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
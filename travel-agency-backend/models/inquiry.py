@@ -1,7 +1,14 @@
 from extensions import db
 from datetime import datetime
+from utils.serialization import serialize, minute_format
 
 class Inquiry(db.Model):
+    __table_args__ = (
+        db.Index('ix_inquiry_status_created', 'status', 'created_at'),
+        db.Index('ix_inquiry_item', 'item_type', 'item_id'),
+        db.Index('ix_inquiry_created', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), nullable=False)
     item_type = db.Column(db.String(20), nullable=False)
@@ -10,13 +17,15 @@ class Inquiry(db.Model):
     status = db.Column(db.String(20), default='new')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    API_FIELDS = {
+        'id': ('id', None),
+        'email': ('email', None),
+        'itemType': ('item_type', None),
+        'itemId': ('item_id', None),
+        'itemTitle': ('item_title', None),
+        'status': ('status', None),
+        'createdAt': ('created_at', minute_format)
+    }
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'itemType': self.item_type,
-            'itemId': self.item_id,
-            'itemTitle': self.item_title,
-            'status': self.status,
-            'createdAt': self.created_at.strftime('%Y-%m-%d %H:%M')
-        }
+        return serialize(self, self.API_FIELDS)
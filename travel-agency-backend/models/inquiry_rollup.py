@@ -0,0 +1,14 @@
+from extensions import db
+
+class InquiryDailyRollup(db.Model):
+    __tablename__ = 'inquiry_daily_rollup'
+    # the primary key serves date ranges, the index per-item history and top-N by item
+    __table_args__ = (
+        db.Index('ix_inquiry_rollup_item_day', 'item_type', 'item_id', 'day'),
+    )
+
+    day = db.Column(db.Date, primary_key=True)
+    item_type = db.Column(db.String(20), primary_key=True)
+    item_id = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -1,4 +1,6 @@
-from extensions import db
+from extensions import db, image_proxy
+from models.columns import updated_at_column
+from utils.serialization import serialize, to_float
 
 class Insurance(db.Model):
     __tablename__ = 'insurances'
@@ -10,14 +12,19 @@ class Insurance(db.Model):
     image_url = db.Column(db.Text)
     features = db.Column(db.Text)
     is_featured = db.Column(db.Boolean, default=False)
+    updated_at = updated_at_column()
+
+    API_FIELDS = {
+        'id': ('id', None),
+        'name': ('name', None),
+        'price': ('price_daily', to_float),
+        'description': ('description', None),
+        'image': ('image_url', None),
+        'imageSrc': ('image_url', image_proxy.src),
+        'imageSrcset': ('image_url', image_proxy.srcset),
+        'features': ('features', None),
+        'featured': ('is_featured', None)
+    }
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'price': float(self.price_daily),
-            'description': self.description,
-            'image': self.image_url,
-            'features': self.features, 
-            'featured': self.is_featured
-        }
+        return serialize(self, self.API_FIELDS)
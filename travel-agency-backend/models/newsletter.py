@@ -1,8 +1,12 @@
 from extensions import db
 from datetime import datetime
+from utils.serialization import serialize, split_list
 
 class Newsletter(db.Model):
     __tablename__ = 'newsletter'
+    __table_args__ = (
+        db.Index('ix_newsletter_created', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(150), unique=True, nullable=False)
@@ -11,11 +15,13 @@ class Newsletter(db.Model):
     interests = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    API_FIELDS = {
+        'id': ('id', None),
+        'email': ('email', None),
+        'firstName': ('first_name', None),
+        'lastName': ('last_name', None),
+        'interests': ('interests', split_list)
+    }
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'firstName': self.first_name,
-            'lastName': self.last_name,
-            'interests': self.interests.split(',') if self.interests else []
-        }
+        return serialize(self, self.API_FIELDS)
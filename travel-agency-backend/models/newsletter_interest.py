@@ -0,0 +1,11 @@
+from extensions import db
+
+class NewsletterInterest(db.Model):
+    __tablename__ = 'newsletter_interest'
+    # the primary key answers "interests of a subscriber", the index "subscribers with an interest"
+    __table_args__ = (
+        db.Index('ix_newsletter_interest_interest', 'interest', 'newsletter_id'),
+    )
+
+    newsletter_id = db.Column(db.Integer, db.ForeignKey('newsletter.id', ondelete='CASCADE'), primary_key=True)
+    interest = db.Column(db.String(50), primary_key=True)
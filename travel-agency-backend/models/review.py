@@ -1,8 +1,16 @@
 from extensions import db
 from datetime import datetime
+from models.columns import updated_at_column
+from utils.serialization import serialize, iso_format
 
 class Review(db.Model):
+    __table_args__ = (
+        db.Index('ix_review_active_created', 'is_active', 'created_at'),
+        db.Index('ix_review_created', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
+    tour_id = db.Column(db.Integer, db.ForeignKey('tours.id', ondelete='SET NULL'), nullable=True, index=True)
     username = db.Column(db.String(100), nullable=False)
     city = db.Column(db.String(100), nullable=False)
     country = db.Column(db.String(100), nullable=False)
@@ -10,15 +18,19 @@ class Review(db.Model):
     comment = db.Column(db.Text, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = updated_at_column()
+
+    API_FIELDS = {
+        'id': ('id', None),
+        'tourId': ('tour_id', None),
+        'username': ('username', None),
+        'city': ('city', None),
+        'country': ('country', None),
+        'rating': ('rating', None),
+        'comment': ('comment', None),
+        'isActive': ('is_active', None),
+        'createdAt': ('created_at', iso_format)
+    }
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'city': self.city,
-            'country': self.country,
-            'rating': self.rating,
-            'comment': self.comment,
-            'isActive': self.is_active,
-            'createdAt': self.created_at.isoformat()
-        }
+        return serialize(self, self.API_FIELDS)
@@ -0,0 +1,8 @@
+from extensions import db
+
+class RevokedToken(db.Model):
+    # refresh tokens revoked at logout; a row outlives restarts and is seen by every worker
+    __tablename__ = 'revoked_token'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,10 @@
+from extensions import db
+from models.columns import PreciseDateTime
+
+class TableVersion(db.Model):
+    # one row per versioned table, bumped in the same transaction as the change it stands for
+    __tablename__ = 'table_version'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(PreciseDateTime)
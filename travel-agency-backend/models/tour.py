@@ -1,17 +1,58 @@
-from extensions import db
+import re
+from extensions import db, image_proxy
 from datetime import date
+from sqlalchemy.orm import validates
+from models.columns import updated_at_column
+from utils.serialization import serialize, to_float, iso_format
+
+_NUMBER_RE = re.compile(r'\d+')
+_DURATION_RE = re.compile(r'(\d+)\s*([a-ząćęłńóśźż]*)', re.IGNORECASE)
+
+
+def parse_capacity(group_size):
+    numbers = [int(n) for n in _NUMBER_RE.findall(str(group_size or ''))]
+    return max(numbers) if numbers else None
+
+
+def parse_duration_days(duration):
+    match = _DURATION_RE.search(str(duration or ''))
+    if not match:
+        return None
+    value, unit = int(match.group(1)), match.group(2).lower()
+    if unit.startswith(('week', 'tydz', 'tyg')):
+        return value * 7
+    if unit.startswith(('night', 'noc')):
+        return value + 1
+    return value
+
 
 class Tour(db.Model):
     __tablename__ = 'tours'
+    __table_args__ = (
+        db.Index('ix_tours_active_dates_capacity', 'is_active', 'start_date', 'end_date', 'capacity'),
+        # list pages order by (start_date, id); the primary key trails every secondary index, so these serve the sort
+        db.Index('ix_tours_active_start', 'is_active', 'start_date'),
+        db.Index('ix_tours_active_featured_start', 'is_active', 'is_featured', 'start_date'),
+        db.Index('ix_tours_start_date', 'start_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     price = db.Column(db.Numeric(10, 2), nullable=False)
     duration = db.Column(db.String(50))
+    duration_days = db.Column(db.Integer)
     group_size = db.Column(db.String(50))
+    capacity = db.Column(db.Integer)
     rating = db.Column(db.Numeric(3, 1), default=0.0)
     reviews_count = db.Column(db.Integer, default=0)
+    # maintained from active reviews by services.ratings, rating = rating_sum / reviews_count
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    stars_1 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    stars_2 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    stars_3 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    stars_4 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    stars_5 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     image_url = db.Column(db.Text)
     location = db.Column(db.String(100))
     region = db.Column(db.String(50))
@@ -19,22 +60,42 @@ class Tour(db.Model):
     start_date = db.Column(db.Date, nullable=True)
     end_date = db.Column(db.Date, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
+    updated_at = updated_at_column()
+
+    API_FIELDS = {
+        'id': ('id', None),
+        'title': ('title', None),
+        'description': ('description', None),
+        'price': ('price', to_float),
+        'duration': ('duration', None),
+        'durationDays': ('duration_days', None),
+        'groupSize': ('group_size', None),
+        'capacity': ('capacity', None),
+        'rating': ('rating', to_float),
+        'reviews': ('reviews_count', None),
+        'image': ('image_url', None),
+        'imageSrc': ('image_url', image_proxy.src),
+        'imageSrcset': ('image_url', image_proxy.srcset),
+        'location': ('location', None),
+        'region': ('region', None),
+        'featured': ('is_featured', None),
+        'startDate': ('start_date', iso_format),
+        'endDate': ('end_date', iso_format),
+        'isActive': ('is_active', None)
+    }
+
+    @validates('group_size')
+    def _sync_capacity(self, key, value):
+        self.capacity = parse_capacity(value)
+        return value
+
+    @validates('duration')
+    def _sync_duration_days(self, key, value):
+        self.duration_days = parse_duration_days(value)
+        return value
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'price': float(self.price),
-            'duration': self.duration,
-            'groupSize': self.group_size,
-            'rating': float(self.rating),
-            'reviews': self.reviews_count,
-            'image': self.image_url,
-            'location': self.location,
-            'region': self.region,
-            'featured': self.is_featured,
-            'startDate': self.start_date.isoformat() if self.start_date else None,
-            'endDate': self.end_date.isoformat() if self.end_date else None,
-            'isActive': self.is_active
-        }
+        return serialize(self, self.API_FIELDS)
+
+    def rating_histogram(self):
+        return {str(star): getattr(self, f'stars_{star}') or 0 for star in range(1, 6)}
@@ -0,0 +1,42 @@
+from flask import Blueprint, Response, jsonify
+from extensions import db, jwt, response_cache, token_blocklist, write_behind, request_metrics
+from services.db_pool import pool_stats
+from flask_jwt_extended import jwt_required
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/cache', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    return jsonify(response_cache.stats())
+
+@admin_bp.route('/cache', methods=['DELETE'])
+@jwt_required()
+def clear_cache():
+    response_cache.clear()
+    return jsonify({'message': 'Cache cleared'})
+
+@admin_bp.route('/pool', methods=['GET'])
+@jwt_required()
+def database_pool():
+    return jsonify(pool_stats(db))
+
+@admin_bp.route('/auth', methods=['GET'])
+@jwt_required()
+def auth_stats():
+    return jsonify({'verifiedTokens': jwt.cache_stats(), 'blocklist': token_blocklist.stats()})
+
+@admin_bp.route('/write-behind', methods=['GET'])
+@jwt_required()
+def write_behind_stats():
+    return jsonify(write_behind.stats())
+
+@admin_bp.route('/write-behind/flush', methods=['POST'])
+@jwt_required()
+def flush_write_behind():
+    return jsonify({'flushed': write_behind.flush()})
+
+@admin_bp.route('/metrics', methods=['GET'])
+@jwt_required()
+def metrics():
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,129 @@
+from flask import g, has_app_context
+from sqlalchemy import select
+from extensions import response_cache, write_behind
+from models.car import Car
+from models.inquiry import Inquiry
+from models.tour import Tour
+from services.asgi_http import AsyncResponse
+from services.catalog import (
+    car_filters, inquiry_row, interest_insert, interest_rows, stored_interests, subscriber_insert, subscriber_row,
+    tour_listing
+)
+from utils.conditional import last_modified_of, stamp_etag, stamp_of, stamp_statement
+from utils.pagination import PaginationError, page_body, page_columns, page_request, paginate_statement
+
+
+# async twins of the hot public routes; endpoint names match the blueprints so cache entries are shared
+def register_async_routes(router, app, database):
+    def json_response(payload, status=200):
+        return AsyncResponse(app.json.dumps(payload).encode(), status=status)
+
+    async def conditional_cached(request, session, model, endpoint, view_args, build):
+        stamps = [stamp_of((await session.execute(stamp_statement(model))).first())]
+        if has_app_context():
+            # the in-memory indexes behind a view refresh on this stamp instead of reading it again
+            g.setdefault('table_stamps', {})[model.__tablename__] = stamps[0]
+        etag = stamp_etag(request.full_path, stamps)
+        last_modified = last_modified_of(stamps)
+
+        if request.if_none_match(etag):
+            response = AsyncResponse(status=304)
+        else:
+            key = response_cache.key(endpoint, view_args, request.args, [(model.__tablename__, stamps[0][0])])
+            body = response_cache.lookup(endpoint, key)
+            if body is not None:
+                response = AsyncResponse(body, headers={'X-Cache': 'HIT'})
+            else:
+                response = await build()
+                if response.status != 200:
+                    return response
+                response_cache.store(key, response.body)
+                response.headers['X-Cache'] = 'MISS'
+
+        response.set_etag(etag, last_modified)
+        return response
+
+    async def paginated(session, statement, model, sort_column, page, descending=False):
+        statement = statement.with_only_columns(*page_columns(model, sort_column, page))
+        statement = paginate_statement(statement, model, sort_column, page, descending)
+        rows = (await session.execute(statement)).all()
+        return json_response(page_body(rows, model, page))
+
+    async def get_tours(request):
+        async with database.session() as session:
+            async def build():
+                filters, sort_column = tour_listing(request.args)
+                if filters is None:
+                    return json_response([])
+                try:
+                    page = page_request(Tour, sort_column, request.args)
+                except PaginationError as e:
+                    return json_response({'error': str(e)}, 400)
+                return await paginated(session, select(Tour).where(*filters), Tour, sort_column, page)
+
+            with app.app_context():
+                return await conditional_cached(request, session, Tour, 'tours.get_tours', {}, build)
+
+    async def get_tour(request, id):
+        async with database.session() as session:
+            async def build():
+                tour = await session.get(Tour, id)
+                if tour is None:
+                    return json_response({'error': 'Not found'}, 404)
+                return json_response({**tour.to_dict(), 'ratingHistogram': tour.rating_histogram()})
+
+            return await conditional_cached(request, session, Tour, 'tours.get_tour', {'id': id}, build)
+
+    async def get_cars(request):
+        async with database.session() as session:
+            async def build():
+                try:
+                    page = page_request(Car, Car.price_per_day, request.args)
+                except PaginationError as e:
+                    return json_response({'error': str(e)}, 400)
+                statement = select(Car).where(*car_filters(request.args))
+                return await paginated(session, statement, Car, Car.price_per_day, page)
+
+            with app.app_context():
+                return await conditional_cached(request, session, Car, 'cars.get_cars', {}, build)
+
+    async def create_inquiry(request):
+        try:
+            row = inquiry_row(request.json())
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+
+        if write_behind.enabled:
+            write_behind.submit('inquiry', row)
+            return json_response({'message': 'Inquiry received'}, 202)
+
+        async with database.session() as session:
+            inquiry = Inquiry(**row)
+            session.add(inquiry)
+            await session.commit()
+            return json_response(inquiry.to_dict(), 201)
+
+    async def subscribe(request):
+        try:
+            row = subscriber_row(request.json())
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+
+        if write_behind.enabled:
+            write_behind.submit('newsletter', row)
+            return json_response({'message': 'Subscribed successfully'}, 202)
+
+        async with database.session() as session:
+            result = await session.execute(subscriber_insert(), row)
+            if result.rowcount:
+                links = interest_rows((await session.execute(stored_interests([row['email']]))).all())
+                if links:
+                    await session.execute(interest_insert(), links)
+            await session.commit()
+            return json_response({'message': 'Subscribed successfully'}, 201 if result.rowcount else 200)
+
+    router.route('GET', '/api/tours', get_tours)
+    router.route('GET', r'/api/tours/(?P<id>\d+)', get_tour)
+    router.route('GET', '/api/cars', get_cars)
+    router.route('POST', '/api/inquiries', create_inquiry)
+    router.route('POST', '/api/newsletter/subscribe', subscribe)
@@ -1,24 +1,47 @@
-from flask import Blueprint, request, jsonify
-from extensions import db
+from flask import Blueprint, request, jsonify, current_app
+from extensions import db, login_limiter, token_blocklist
+from services.hashing import HashingBusy
 from models.user import User
 from flask_jwt_extended import (
     create_access_token, 
+    create_refresh_token,
+    decode_token,
     jwt_required,
     set_access_cookies, 
+    set_refresh_cookies,
     unset_jwt_cookies,
     get_jwt_identity
 )
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 
 auth_bp = Blueprint('auth', __name__)
 
+def too_many_attempts(retry_after):
+    response = jsonify({'error': 'Too many attempts, try again later'})
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response, 429
+
+def hashing_busy():
+    response = jsonify({'error': 'Server busy, try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.json
+    retry_after = login_limiter.check(None, request.remote_addr)
+    if retry_after:
+        return too_many_attempts(retry_after)
+
     if User.query.filter_by(username=data['username']).first():
         return jsonify({'error': 'User already exists'}), 400
         
     new_user = User(username=data['username'])
-    new_user.set_password(data['password'])
+    try:
+        new_user.set_password(data['password'])
+    except HashingBusy:
+        return hashing_busy()
     
     db.session.add(new_user)
     db.session.commit()
@@ -28,20 +51,56 @@ def register():
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.json
+    retry_after = login_limiter.check(data.get('username'), request.remote_addr)
+    if retry_after:
+        return too_many_attempts(retry_after)
+
     user = User.query.filter_by(username=data.get('username')).first()
-    
-    if user and user.check_password(data.get('password')):
+    if not user or not data.get('password'):
+        return jsonify({'error': 'Invalid credentials'}), 401
 
+    try:
+        valid = user.check_password(data['password'])
+        if valid and user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+    except HashingBusy:
+        return hashing_busy()
+
+    if valid:
         access_token = create_access_token(identity=str(user.id))
+        refresh_token = create_refresh_token(identity=str(user.id))
         
         response = jsonify({"message": "Login successful"})
         set_access_cookies(response, access_token)
+        set_refresh_cookies(response, refresh_token)
         return response, 200
         
     return jsonify({'error': 'Invalid credentials'}), 401
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    access_token = create_access_token(identity=get_jwt_identity())
+    response = jsonify({"message": "Token refreshed"})
+    set_access_cookies(response, access_token)
+    return response, 200
+
+def revoke_cookie_token(cookie_name, revoke):
+    encoded_token = request.cookies.get(current_app.config[cookie_name])
+    if not encoded_token:
+        return
+    try:
+        claims = decode_token(encoded_token, allow_expired=True)
+    except (PyJWTError, JWTExtendedException):
+        return
+    revoke(claims['jti'], claims.get('exp', 0))
+
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
+    revoke_cookie_token('JWT_ACCESS_COOKIE_NAME', token_blocklist.revoke)
+    revoke_cookie_token('JWT_REFRESH_COOKIE_NAME', token_blocklist.revoke_refresh)
+
     response = jsonify({"message": "Successfully logged out"})
     unset_jwt_cookies(response)
     return response, 200
@@ -1,19 +1,51 @@
-from flask import Blueprint, request, jsonify
-from extensions import db
+from datetime import date
+from flask import Blueprint, request, jsonify, current_app
+from extensions import db, response_cache, car_availability, car_facets
 from models.car import Car
+from models.car_booking import CarBooking
+from utils.pagination import paginated_response
+from utils.conditional import conditional
+from services.routing import replica_reads
+from services.bulk_import import ImportPayloadError, import_cars, items_from_request
+from services.catalog import car_filters, checked_row
+from services.availability import parse_range
+from flask_jwt_extended import jwt_required
 
 cars_bp = Blueprint('cars', __name__)
 
 @cars_bp.route('', methods=['GET'])
+@replica_reads
+@conditional(Car)
+@response_cache.cached(Car)
 def get_cars():
-    admin_request = request.args.get('admin', 'false') == 'true'
-    
-    query = Car.query
-    if not admin_request:
-        query = query.filter_by(is_active=True)
-        
-    cars = query.order_by(Car.price_per_day.asc()).all()
-    return jsonify([c.to_dict() for c in cars])
+    query = Car.query.filter(*car_filters(request.args))
+    return paginated_response(query, Car, Car.price_per_day)
+
+def _multi(name):
+    # ?category=suv&category=van and ?category=suv,van both select two values
+    return [value.strip() for raw in request.args.getlist(name) for value in raw.split(',') if value.strip()]
+
+@cars_bp.route('/search', methods=['GET'])
+@replica_reads
+@conditional(Car)
+@response_cache.cached(Car)
+def search_cars():
+    try:
+        selected = {
+            'category': _multi('category'),
+            'seats': [int(value) for value in _multi('seats')],
+            'transmission': _multi('transmission'),
+            'features': _multi('feature')
+        }
+        min_price = request.args.get('minPrice', type=float)
+        max_price = request.args.get('maxPrice', type=float)
+    except ValueError:
+        return jsonify({'error': 'seats must be a number'}), 400
+
+    limit = request.args.get('limit', current_app.config['DEFAULT_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return jsonify(car_facets.search(selected, min_price, max_price, offset, limit))
 
 @cars_bp.route('', methods=['POST'])
 def create_car():
@@ -32,6 +64,17 @@ def create_car():
     db.session.commit()
     return jsonify(new_car.to_dict()), 201
 
+@cars_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_import_cars():
+    try:
+        items = items_from_request(request)
+    except ImportPayloadError as e:
+        return jsonify({'error': str(e)}), 400
+
+    chunk_size = request.args.get('chunkSize', current_app.config['IMPORT_CHUNK_SIZE'], type=int)
+    return jsonify(import_cars(items, max(chunk_size, 1)))
+
 @cars_bp.route('/<int:id>', methods=['PUT'])
 def update_car(id):
     car = Car.query.get_or_404(id)
@@ -55,3 +98,89 @@ def delete_car(id):
     db.session.delete(car)
     db.session.commit()
     return jsonify({'message': 'Car deleted'})
+
+@cars_bp.route('/availability', methods=['GET'])
+def get_available_cars():
+    try:
+        start, end = parse_range(request.args.get('startDate'), request.args.get('endDate'))
+        seats = request.args.get('seats', type=int)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = Car.query.filter(Car.is_active == True)
+    if request.args.get('category'):
+        query = query.filter(Car.category == request.args['category'])
+    if request.args.get('transmission'):
+        query = query.filter(Car.transmission == request.args['transmission'])
+    if seats:
+        query = query.filter(Car.seats >= seats)
+
+    limit = request.args.get('limit', current_app.config['DEFAULT_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+
+    # candidates come from SQL in price order, the date overlap check runs against the in-memory intervals
+    car_availability.ensure_fresh()
+    candidate_ids = [row.id for row in query.with_entities(Car.id).order_by(Car.price_per_day, Car.id)]
+    free_ids = car_availability.free_cars(candidate_ids, start, end)[:limit]
+
+    cars = {car.id: car for car in Car.query.filter(Car.id.in_(free_ids))} if free_ids else {}
+    return jsonify([cars[car_id].to_dict() for car_id in free_ids if car_id in cars])
+
+@cars_bp.route('/<int:id>/bookings', methods=['POST'])
+def create_booking(id):
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    try:
+        start, end = parse_range(data.get('startDate'), data.get('endDate'))
+        if not data.get('email'):
+            raise ValueError('Missing required fields')
+        row = checked_row(CarBooking, {'car_id': id, 'email': data['email'], 'start_date': start, 'end_date': end})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if start < date.today():
+        return jsonify({'error': 'startDate is in the past'}), 400
+
+    # bookings of one car queue up on this row lock until commit (a write lock on SQLite),
+    # so the overlap check below cannot race another request; updated_at is kept so the car ETag stays valid
+    locked = db.session.connection().execute(
+        db.update(Car)
+        .where(Car.id == id, Car.is_active == True)
+        .values(booking_version=Car.booking_version + 1, updated_at=Car.updated_at)
+    )
+    if not locked.rowcount:
+        db.session.rollback()
+        return jsonify({'error': 'Car not found'}), 404
+
+    conflict = db.session.query(CarBooking.id).filter(
+        CarBooking.car_id == id,
+        CarBooking.status == 'confirmed',
+        CarBooking.start_date < end,
+        CarBooking.end_date > start
+    ).first()
+    if conflict:
+        db.session.rollback()
+        return jsonify({'error': 'Car is already booked for these dates'}), 409
+
+    booking = CarBooking(**row)
+    db.session.add(booking)
+    db.session.commit()
+    return jsonify(booking.to_dict()), 201
+
+@cars_bp.route('/bookings', methods=['GET'])
+@jwt_required()
+def get_bookings():
+    query = CarBooking.query
+    if request.args.get('carId'):
+        query = query.filter(CarBooking.car_id == request.args.get('carId', type=int))
+    if request.args.get('status'):
+        query = query.filter(CarBooking.status == request.args['status'])
+    return paginated_response(query, CarBooking, CarBooking.start_date, always_paged=True)
+
+@cars_bp.route('/bookings/<int:id>', methods=['DELETE'])
+@jwt_required()
+def cancel_booking(id):
+    booking = CarBooking.query.get_or_404(id)
+    booking.status = 'cancelled'
+    db.session.commit()
+    return jsonify(booking.to_dict())
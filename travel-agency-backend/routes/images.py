@@ -0,0 +1,22 @@
+from flask import Blueprint, request, jsonify, send_file
+from extensions import image_proxy
+from services.images import ImageError
+
+images_bp = Blueprint('images', __name__)
+
+@images_bp.route('/<int:width>.<image_format>', methods=['GET'])
+def get_image(width, image_format):
+    src = request.args.get('src', '')
+    if not image_proxy.enabled:
+        return jsonify({'error': 'Image proxy is disabled'}), 404
+    if not src or not image_proxy.verify(src, request.args.get('sig')):
+        return jsonify({'error': 'Invalid image signature'}), 403
+
+    try:
+        image, mimetype, etag = image_proxy.variant(src, width, image_format)
+    except ImageError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    # the URL names the source and the width, so a variant only changes when the source does;
+    # the etag is the variant's content key
+    return send_file(image, mimetype=mimetype, max_age=image_proxy.source_ttl, conditional=True, etag=etag)
@@ -1,24 +1,37 @@
+from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
-from extensions import db
+from extensions import db, write_behind, inquiry_rollups
 from models.inquiry import Inquiry
 from flask_jwt_extended import jwt_required
+from utils.pagination import paginated_response
+from utils.export import export_response
+from services.write_behind import parse_timestamp
+from services.catalog import inquiry_row
+from services.inquiry_rollups import summarize
 
 inquiries_bp = Blueprint('inquiries', __name__)
 
+
+def insert_inquiries(rows):
+    for row in rows:
+        row['created_at'] = parse_timestamp(row['created_at'])
+    db.session.execute(Inquiry.__table__.insert(), rows)
+    inquiry_rollups.add_rows(db.session.connection(), rows)
+
+write_behind.register('inquiry', insert_inquiries)
+
 @inquiries_bp.route('', methods=['POST'])
 def create_inquiry():
-    data = request.json
-    
-    if not data.get('email') or not data.get('itemTitle'):
-        return jsonify({'error': 'Missing required fields'}), 400
-
-    new_inquiry = Inquiry(
-        email=data['email'],
-        item_type=data.get('type', 'unknown'),
-        item_id=str(data.get('id', '0')),
-        item_title=data['itemTitle'],
-        status='new'
-    )
+    try:
+        row = inquiry_row(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if write_behind.enabled:
+        write_behind.submit('inquiry', row)
+        return jsonify({'message': 'Inquiry received'}), 202
+
+    new_inquiry = Inquiry(**row)
     
     try:
         db.session.add(new_inquiry)
@@ -30,8 +43,52 @@ def create_inquiry():
 @inquiries_bp.route('', methods=['GET'])
 @jwt_required()
 def get_inquiries():
-    inquiries = Inquiry.query.order_by(Inquiry.created_at.desc()).all()
-    return jsonify([i.to_dict() for i in inquiries])
+    return paginated_response(Inquiry.query, Inquiry, Inquiry.created_at, descending=True, always_paged=True)
+
+# query names of the rollup columns the analytics endpoint can group and filter by
+ANALYTICS_COLUMNS = {'day': 'day', 'status': 'status', 'itemType': 'item_type', 'itemId': 'item_id'}
+
+@inquiries_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    try:
+        # rollup days are UTC dates of created_at, so today is the UTC one too
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') \
+            else datetime.utcnow().date()
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') \
+            else end - timedelta(days=29)
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD'}), 400
+
+    group_by = [name for name in request.args.get('groupBy', 'day,status').split(',') if name]
+    unknown = [name for name in group_by if name not in ANALYTICS_COLUMNS]
+    if unknown:
+        return jsonify({'error': f"Unknown groupBy: {', '.join(unknown)}"}), 400
+
+    filters = {column: request.args[name] for name, column in ANALYTICS_COLUMNS.items()
+               if name != 'day' and request.args.get(name)}
+    top = max(0, min(request.args.get('top', 10, type=int), 100))
+
+    summary = summarize(db.session, start, end, [ANALYTICS_COLUMNS[name] for name in group_by], filters, top)
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'total': summary['total'],
+        'groups': [
+            {**{name: value.isoformat() if name == 'day' else value for name, value in zip(group_by, key)},
+             'count': count}
+            for key, count in summary['groups']
+        ],
+        'topItems': [
+            {'itemType': item_type, 'itemId': item_id, 'count': count}
+            for item_type, item_id, count in summary['topItems']
+        ]
+    })
+
+@inquiries_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_inquiries():
+    return export_response(Inquiry, 'inquiries')
 
 @inquiries_bp.route('/<int:id>/status', methods=['PUT'])
 @jwt_required()
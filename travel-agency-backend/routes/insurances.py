@@ -1,14 +1,19 @@
 from flask import Blueprint, request, jsonify
-from extensions import db
+from extensions import db, response_cache
 from models.insurance import Insurance
 from flask_jwt_extended import jwt_required
+from utils.conditional import conditional
+from services.routing import replica_reads
+from utils.serialization import serialize_query
 
 insurance_bp = Blueprint('insurances', __name__)
 
 @insurance_bp.route('', methods=['GET'])
+@replica_reads
+@conditional(Insurance)
+@response_cache.cached(Insurance)
 def get_insurances():
-    plans = Insurance.query.all()
-    return jsonify([plan.to_dict() for plan in plans])
+    return jsonify(serialize_query(Insurance.query.order_by(Insurance.id), Insurance))
 
 @insurance_bp.route('', methods=['POST'])
 @jwt_required()
@@ -1,25 +1,48 @@
 from flask import Blueprint, request, jsonify
-from extensions import db
+from extensions import db, write_behind
 from models.newsletter import Newsletter
+from models.newsletter_interest import NewsletterInterest
 from flask_jwt_extended import jwt_required
+from utils.pagination import paginated_response
+from utils.export import export_response
+from services.write_behind import parse_timestamp
+from services.catalog import interest_insert, interest_rows, stored_interests, subscriber_insert, subscriber_row
+from services.segments import SegmentError, interest_count_statement, segment_filter
 
 newsletter_bp = Blueprint('newsletter', __name__)
 
+
+def insert_subscribers(rows):
+    for row in rows:
+        row['created_at'] = parse_timestamp(row['created_at'])
+    db.session.execute(subscriber_insert(), rows)
+    links = interest_rows(db.session.execute(stored_interests([row['email'] for row in rows])))
+    if links:
+        db.session.execute(interest_insert(), links)
+
+write_behind.register('newsletter', insert_subscribers)
+
 @newsletter_bp.route('/subscribe', methods=['POST'])
 def subscribe():
-    data = request.json
+    try:
+        row = subscriber_row(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if write_behind.enabled:
+        write_behind.submit('newsletter', row)
+        return jsonify({'message': 'Subscribed successfully'}), 202
     
-    if Newsletter.query.filter_by(email=data['email']).first():
+    if Newsletter.query.filter_by(email=row['email']).first():
         return jsonify({'message': 'Subscribed successfully'}), 200
         
     try:
-        entry = Newsletter(
-            email=data['email'],
-            first_name=data.get('firstName', ''),
-            last_name=data.get('lastName', ''),
-            interests=','.join(data.get('interests', []))
-        )
+        entry = Newsletter(**row)
         db.session.add(entry)
+        db.session.flush()
+        links = interest_rows([(entry.id, entry.interests)])
+        if links:
+            db.session.execute(interest_insert(), links)
         db.session.commit()
         return jsonify({'message': 'Subscribed successfully'}), 201
     except Exception as e:
@@ -28,13 +51,43 @@ def subscribe():
 @newsletter_bp.route('', methods=['GET'])
 @jwt_required()
 def get_subscribers():
-    subscribers = Newsletter.query.all()
-    return jsonify([sub.to_dict() for sub in subscribers])
+    return paginated_response(Newsletter.query, Newsletter, Newsletter.created_at, always_paged=True)
+
+@newsletter_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_subscribers():
+    return export_response(Newsletter, 'newsletter')
+
+@newsletter_bp.route('/segment', methods=['GET'])
+@jwt_required()
+def segment_count():
+    try:
+        criteria, terms = segment_filter(request.args.get('q'))
+    except SegmentError as e:
+        return jsonify({'error': str(e)}), 400
+
+    count = db.session.execute(db.select(db.func.count(Newsletter.id)).where(criteria)).scalar()
+    per_interest = dict(db.session.execute(interest_count_statement(terms)).all())
+    return jsonify({
+        'query': request.args.get('q'),
+        'count': count,
+        'interests': {term: per_interest.get(term, 0) for term in terms}
+    })
+
+@newsletter_bp.route('/segment/export', methods=['GET'])
+@jwt_required()
+def export_segment():
+    try:
+        criteria, _ = segment_filter(request.args.get('q'))
+    except SegmentError as e:
+        return jsonify({'error': str(e)}), 400
+    return export_response(Newsletter, 'segment', filters=(criteria,), default_fields=['email'])
 
 @newsletter_bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()
 def delete_subscriber(id):
     subscriber = Newsletter.query.get_or_404(id)
+    NewsletterInterest.query.filter_by(newsletter_id=id).delete()
     db.session.delete(subscriber)
     db.session.commit()
     return jsonify({'message': 'Subscriber deleted'})
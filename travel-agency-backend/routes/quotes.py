@@ -0,0 +1,17 @@
+from flask import Blueprint, request, jsonify
+from extensions import quote_engine
+from services.quotes import QuoteError
+from services.routing import replica_reads
+
+quotes_bp = Blueprint('quotes', __name__)
+
+@quotes_bp.route('', methods=['POST'])
+@replica_reads
+def create_quote():
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    try:
+        return jsonify(quote_engine.quote(data))
+    except QuoteError as e:
+        return jsonify({'error': str(e)}), 400
@@ -1,24 +1,35 @@
 from flask import Blueprint, request, jsonify
-from extensions import db
+from extensions import db, response_cache
 from models.review import Review
+from models.tour import Tour
+from utils.pagination import paginated_response
+from utils.conditional import conditional
+from services.routing import replica_reads
+from utils.serialization import serialize_query
 
 reviews_bp = Blueprint('reviews', __name__)
 
 @reviews_bp.route('', methods=['GET'])
+@replica_reads
+@conditional(Review)
+@response_cache.cached(Review)
 def get_reviews():
     admin_request = request.args.get('admin', 'false') == 'true'
     
     if admin_request:
-        reviews = Review.query.order_by(Review.created_at.desc()).all()
-    else:
-        reviews = Review.query.filter_by(is_active=True).order_by(Review.created_at.desc()).limit(3).all()
-        
-    return jsonify([r.to_dict() for r in reviews])
+        return paginated_response(Review.query, Review, Review.created_at, descending=True, always_paged=True)
+
+    query = Review.query.filter_by(is_active=True).order_by(Review.created_at.desc()).limit(3)
+    return jsonify(serialize_query(query, Review))
 
 @reviews_bp.route('', methods=['POST'])
 def create_review():
     data = request.json
+    if data.get('tourId') is not None and db.session.get(Tour, data['tourId']) is None:
+        return jsonify({'error': 'Tour not found'}), 400
+
     new_review = Review(
+        tour_id=data.get('tourId'),
         username=data['username'],
         city=data['city'],
         country=data['country'],
@@ -42,6 +53,10 @@ def update_review(id):
     review = Review.query.get_or_404(id)
     data = request.json
     
+    if 'tourId' in data:
+        if data['tourId'] is not None and db.session.get(Tour, data['tourId']) is None:
+            return jsonify({'error': 'Tour not found'}), 400
+        review.tour_id = data['tourId']
     review.username = data.get('username', review.username)
     review.city = data.get('city', review.city)
     review.country = data.get('country', review.country)
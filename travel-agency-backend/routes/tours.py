@@ -1,67 +1,38 @@
-from flask import Blueprint, request, jsonify
-from extensions import db
+import logging
+from flask import Blueprint, request, jsonify, current_app
+from extensions import db, response_cache
 from models.tour import Tour
 from flask_jwt_extended import jwt_required
 from datetime import datetime
-from sqlalchemy import cast, Integer, or_
+from utils.pagination import paginated_response
+from utils.conditional import conditional
+from services.routing import replica_reads
+from services.bulk_import import ImportPayloadError, import_tours, items_from_request
+from services.catalog import tour_listing
+
+logger = logging.getLogger(__name__)
 
 tours_bp = Blueprint('tours', __name__)
 
 @tours_bp.route('', methods=['GET'])
+@replica_reads
+@conditional(Tour)
+@response_cache.cached(Tour)
 def get_tours():
-    search_query = request.args.get('q', '').strip()
-    start_date = request.args.get('startDate')
-    end_date = request.args.get('endDate')
-    guests = request.args.get('guests')
-    is_admin = request.args.get('admin', 'false') == 'true'
-    only_featured = request.args.get('featured', 'false') == 'true'
-    
-    query = Tour.query
-
-    if not is_admin:
-        query = query.filter(Tour.is_active == True)
-
-    if only_featured:
-        query = query.filter(Tour.is_featured == True)
-
-    if search_query:
-        search_term = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                Tour.title.ilike(search_term),
-                Tour.location.ilike(search_term)
-            )
-        )
-
-    if start_date and start_date != '':
-        try:
-            date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Tour.start_date >= date_obj)
-        except ValueError:
-            print(f"Invalid start_date format: {start_date}")
-
-    if end_date and end_date != '':
-        try:
-            date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Tour.end_date <= date_obj)
-        except ValueError:
-             print(f"Invalid end_date format: {end_date}")
+    filters, sort_column = tour_listing(request.args)
+    if filters is None:
+        return jsonify([])
 
-    if guests and guests != '':
-        try:
-            guests_int = int(guests)
-            query = query.filter(cast(Tour.group_size, Integer) >= guests_int)
-        except ValueError:
-            pass
-
-    tours = query.order_by(Tour.start_date.asc()).all()
-    
-    return jsonify([t.to_dict() for t in tours])
+    query = Tour.query.filter(*filters)
+    return paginated_response(query, Tour, sort_column)
 
 @tours_bp.route('/<int:id>', methods=['GET'])
+@replica_reads
+@conditional(Tour)
+@response_cache.cached(Tour)
 def get_tour(id):
     tour = Tour.query.get_or_404(id)
-    return jsonify(tour.to_dict())
+    return jsonify({**tour.to_dict(), 'ratingHistogram': tour.rating_histogram()})
 
 @tours_bp.route('', methods=['POST'])
 @jwt_required()
@@ -82,8 +53,6 @@ def add_tour():
             price=data['price'],
             duration=data.get('duration', '1 day'),
             group_size=data.get('groupSize', '10'),
-            rating=data.get('rating', 0.0),
-            reviews_count=data.get('reviews', 0),
             image_url=data.get('image', ''),
             location=data.get('location', ''),
             region=data.get('region', 'europe'),
@@ -96,9 +65,20 @@ def add_tour():
         db.session.commit()
         return jsonify(new_tour.to_dict()), 201
     except Exception as e:
-        print(f"Error adding tour: {e}")
+        logger.exception('Error adding tour')
+        return jsonify({'error': str(e)}), 400
+
+@tours_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_import_tours():
+    try:
+        items = items_from_request(request)
+    except ImportPayloadError as e:
         return jsonify({'error': str(e)}), 400
 
+    chunk_size = request.args.get('chunkSize', current_app.config['IMPORT_CHUNK_SIZE'], type=int)
+    return jsonify(import_tours(items, max(chunk_size, 1)))
+
 @tours_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_tour(id):
@@ -115,7 +95,6 @@ def update_tour(id):
     if 'region' in data: tour.region = data['region']
     if 'isActive' in data: tour.is_active = data['isActive']
     if 'featured' in data: tour.is_featured = data['featured']
-    if 'rating' in data: tour.rating = data['rating']
 
     if 'startDate' in data:
         if data['startDate']:
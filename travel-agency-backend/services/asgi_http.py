@@ -0,0 +1,120 @@
+import json
+import logging
+import re
+from urllib.parse import parse_qsl
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date, parse_etags
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequest:
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query_string = scope['query_string'].decode('latin-1')
+        self.args = MultiDict(parse_qsl(self.query_string, keep_blank_values=True))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        self.body = body
+
+    @property
+    def full_path(self):
+        # same shape as flask.Request.full_path, which ETags are derived from
+        return f'{self.path}?{self.query_string}'
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b'null')
+        except ValueError:
+            raise ValueError('Invalid JSON body')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+        return data
+
+    def if_none_match(self, etag):
+        header = self.headers.get('if-none-match')
+        return bool(header) and parse_etags(header).contains(etag)
+
+
+class AsyncResponse:
+    def __init__(self, body=b'', status=200, headers=None, content_type='application/json'):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {})
+        if body or status != 304:
+            self.headers.setdefault('Content-Type', content_type)
+
+    def set_etag(self, etag, last_modified=None):
+        self.headers['ETag'] = f'"{etag}"'
+        if last_modified:
+            self.headers['Last-Modified'] = http_date(last_modified)
+        self.headers['Cache-Control'] = 'no-cache'
+
+    async def send(self, send):
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in self.headers.items()]
+        headers.append((b'content-length', str(len(self.body)).encode()))
+        await send({'type': 'http.response.start', 'status': self.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': self.body})
+
+
+# serves the registered routes natively and hands every other request to the fallback ASGI app
+class AsyncRouter:
+    def __init__(self, fallback, cors_origins=(), on_shutdown=None):
+        self.fallback = fallback
+        self.cors_origins = set(cors_origins)
+        self.on_shutdown = on_shutdown
+        self._routes = []
+
+    def route(self, method, pattern, handler):
+        self._routes.append((method, re.compile(f'^{pattern}$'), handler))
+
+    def match(self, method, path):
+        for route_method, pattern, handler in self._routes:
+            if route_method == method:
+                match = pattern.match(path)
+                if match:
+                    return handler, {name: int(value) for name, value in match.groupdict().items()}
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        handler, params = self.match(scope.get('method'), scope.get('path', ''))
+        if scope['type'] != 'http' or handler is None:
+            return await self.fallback(scope, receive, send)
+
+        request = AsyncRequest(scope, await _read_body(receive))
+        try:
+            response = await handler(request, **params)
+        except Exception:
+            logger.exception('Unhandled error in %s %s', request.method, request.path)
+            response = AsyncResponse(b'{"error":"Internal server error"}', status=500)
+
+        # preflights still go to Flask-CORS through the fallback, the actual responses are answered here
+        origin = request.headers.get('origin')
+        if origin in self.cors_origins:
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Access-Control-Allow-Credentials'] = 'true'
+            response.headers['Vary'] = 'Origin'
+        await response.send(send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.on_shutdown is not None:
+                    await self.on_shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
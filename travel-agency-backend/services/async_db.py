@@ -0,0 +1,43 @@
+from sqlalchemy.engine import make_url
+
+# first entry is the default when ASYNC_DB_DRIVER is empty
+ASYNC_DRIVERS = {
+    'mysql': ('asyncmy', 'aiomysql'),
+    'sqlite': ('aiosqlite',),
+}
+
+
+def async_url(url, driver=None):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend}')
+    return url.set(drivername=f'{backend}+{driver or ASYNC_DRIVERS[backend][0]}')
+
+
+class AsyncDatabase:
+    def __init__(self):
+        self.engine = None
+        self.session = None
+
+    def init_app(self, app):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        config = app.config
+        url = async_url(config['SQLALCHEMY_DATABASE_URI'], config['ASYNC_DB_DRIVER'])
+        options = {}
+        if url.get_backend_name() != 'sqlite':
+            options = {
+                'pool_size': config['DB_POOL_SIZE'],
+                'max_overflow': config['DB_MAX_OVERFLOW'],
+                'pool_recycle': config['DB_POOL_RECYCLE'],
+                'pool_timeout': config['DB_POOL_TIMEOUT'],
+                'pool_pre_ping': config['DB_POOL_PRE_PING']
+            }
+        self.engine = create_async_engine(url, **options)
+        # handlers serialize objects after commit, so keep their loaded state
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
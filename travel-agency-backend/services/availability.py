@@ -0,0 +1,171 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# commits can land after a newer updated_at was already synced; re-read this far back (applying is idempotent)
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def parse_range(start, end):
+    if not start or not end:
+        raise ValueError('startDate and endDate are required')
+    try:
+        start = datetime.strptime(start, '%Y-%m-%d').date()
+        end = datetime.strptime(end, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Dates must be YYYY-MM-DD')
+    if end <= start:
+        raise ValueError('endDate must be after startDate')
+    return start, end
+
+
+class CarIntervals:
+    # confirmed bookings of one car, non-overlapping and sorted, so ends are sorted too
+    __slots__ = ('starts', 'ends', 'ids')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+
+    def insert(self, booking_id, start, end):
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.ids.insert(position, booking_id)
+
+    def remove(self, booking_id, start):
+        position = bisect_left(self.starts, start)
+        while position < len(self.ids) and self.starts[position] == start:
+            if self.ids[position] == booking_id:
+                del self.starts[position], self.ends[position], self.ids[position]
+                return
+            position += 1
+
+    def is_free(self, start, end):
+        # first booking that ends after the requested start; free unless it also starts before the requested end
+        position = bisect_right(self.ends, start)
+        return position == len(self.ends) or self.starts[position] >= end
+
+
+class CarAvailabilityIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cars = defaultdict(CarIntervals)
+        self._bookings = {}
+        self._watermark = None
+        self._synced_at = 0.0
+        self.sync_interval = 2.0
+        self.is_built = False
+        self._listening = False
+
+    def init_app(self, app):
+        self.sync_interval = app.config['AVAILABILITY_SYNC_SECONDS']
+        if not self._listening:
+            event.listen(Session, 'after_flush', _collect_bookings)
+            event.listen(Session, 'after_commit', self._apply_committed)
+            event.listen(Session, 'after_rollback', _forget_bookings)
+            self._listening = True
+
+    def rebuild(self):
+        from models.car_booking import CarBooking
+
+        # later syncs only look at bookings changed since the rebuild started
+        watermark = datetime.utcnow()
+        rows = CarBooking.query.with_entities(
+            CarBooking.id, CarBooking.car_id, CarBooking.start_date, CarBooking.end_date
+        ).filter(CarBooking.status == 'confirmed', CarBooking.end_date > date.today()).yield_per(5000)
+
+        cars = defaultdict(CarIntervals)
+        bookings = {}
+        for booking_id, car_id, start, end in rows:
+            cars[car_id].insert(booking_id, start, end)
+            bookings[booking_id] = (car_id, start)
+
+        with self._lock:
+            self._cars = cars
+            self._bookings = bookings
+            self._watermark = watermark
+            self._synced_at = time.monotonic()
+            self.is_built = True
+
+    def ensure_fresh(self):
+        # picks up bookings committed by other worker processes
+        if not self.is_built:
+            with self._lock:
+                if not self.is_built:
+                    self.rebuild()
+            return
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return
+
+        from models.car_booking import CarBooking
+
+        query = CarBooking.query.with_entities(
+            CarBooking.id, CarBooking.car_id, CarBooking.start_date, CarBooking.end_date,
+            CarBooking.status, CarBooking.updated_at
+        ).filter(CarBooking.updated_at >= self._watermark - SYNC_OVERLAP)
+
+        with self._lock:
+            for booking_id, car_id, start, end, status, updated_at in query:
+                self._apply(booking_id, car_id, start, end, status == 'confirmed')
+                if updated_at and updated_at > self._watermark:
+                    self._watermark = updated_at
+            self._synced_at = time.monotonic()
+
+    def is_free(self, car_id, start, end):
+        with self._lock:
+            intervals = self._cars.get(car_id)
+            return intervals is None or intervals.is_free(start, end)
+
+    def free_cars(self, car_ids, start, end):
+        with self._lock:
+            cars = self._cars
+            return [car_id for car_id in car_ids if car_id not in cars or cars[car_id].is_free(start, end)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'built': self.is_built,
+                'cars': len(self._cars),
+                'bookings': len(self._bookings),
+                'watermark': self._watermark.isoformat() if self._watermark else None
+            }
+
+    def _apply(self, booking_id, car_id, start, end, confirmed):
+        previous = self._bookings.pop(booking_id, None)
+        if previous is not None:
+            self._cars[previous[0]].remove(booking_id, previous[1])
+        if confirmed and end > date.today():
+            self._cars[car_id].insert(booking_id, start, end)
+            self._bookings[booking_id] = (car_id, start)
+
+    def _apply_committed(self, session):
+        changes = session.info.pop('booking_changes', None)
+        if not changes or not self.is_built:
+            return
+        with self._lock:
+            for booking_id, change in changes.items():
+                self._apply(booking_id, *change)
+
+
+def _collect_bookings(session, flush_context):
+    from models.car_booking import CarBooking
+
+    changes = None
+    for booking in (*session.new, *session.dirty):
+        if isinstance(booking, CarBooking):
+            changes = session.info.setdefault('booking_changes', {})
+            changes[booking.id] = (booking.car_id, booking.start_date, booking.end_date, booking.status == 'confirmed')
+    for booking in session.deleted:
+        if isinstance(booking, CarBooking):
+            changes = session.info.setdefault('booking_changes', {})
+            changes[booking.id] = (booking.car_id, booking.start_date, booking.end_date, False)
+
+
+def _forget_bookings(session):
+    session.info.pop('booking_changes', None)
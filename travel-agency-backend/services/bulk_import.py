@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db
+from models.car import Car
+from models.tour import Tour, parse_capacity, parse_duration_days
+from services.catalog import checked_row
+from services.write_behind import is_transient
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+
+class ImportPayloadError(ValueError):
+    pass
+
+
+def parse_bool(value, default):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_date(value):
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def parse_id(value):
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def required(item, key):
+    value = item.get(key)
+    if value is None or value == '':
+        raise ValueError(f'Missing required field: {key}')
+    return value
+
+
+def tour_row(item):
+    duration = item.get('duration') or '1 day'
+    group_size = str(item.get('groupSize') or '10')
+    return checked_row(Tour, {
+        'id': parse_id(item.get('id')),
+        'title': required(item, 'title'),
+        'description': item.get('description', ''),
+        'price': float(required(item, 'price')),
+        'duration': duration,
+        'duration_days': parse_duration_days(duration),
+        'group_size': group_size,
+        'capacity': parse_capacity(group_size),
+        'image_url': item.get('image', ''),
+        'location': item.get('location', ''),
+        'region': item.get('region') or 'europe',
+        'is_featured': parse_bool(item.get('featured'), False),
+        'is_active': parse_bool(item.get('isActive'), True),
+        'start_date': parse_date(item.get('startDate')),
+        'end_date': parse_date(item.get('endDate'))
+    })
+
+
+def car_row(item):
+    features = item.get('features', '')
+    if isinstance(features, list):
+        features = ','.join(features)
+    return checked_row(Car, {
+        'id': parse_id(item.get('id')),
+        'name': required(item, 'name'),
+        'category': required(item, 'category'),
+        'price_per_day': float(required(item, 'price')),
+        'seats': int(required(item, 'seats')),
+        'transmission': required(item, 'transmission'),
+        'image_url': item.get('image', ''),
+        'features': features,
+        'is_active': parse_bool(item.get('isActive'), True)
+    })
+
+
+def read_items(content, content_type):
+    if 'csv' in content_type:
+        return list(csv.DictReader(io.StringIO(content)))
+    try:
+        items = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ImportPayloadError(f'Invalid JSON: {e}')
+    if not isinstance(items, list):
+        raise ImportPayloadError('Expected a JSON array')
+    return items
+
+
+def items_from_request(request):
+    upload = request.files.get('file')
+    if upload:
+        content_type = 'csv' if upload.filename.lower().endswith('.csv') else 'json'
+        return read_items(upload.read().decode('utf-8-sig'), content_type)
+    return read_items(request.get_data(as_text=True), request.content_type or 'json')
+
+
+def _upsert_statement(table, rows):
+    dialect = db.engine.dialect.name
+    update_columns = [key for key in rows[0] if key != 'id']
+
+    if dialect == 'mysql':
+        statement = mysql_insert(table).values(rows)
+        return statement.on_duplicate_key_update({key: statement.inserted[key] for key in update_columns})
+    if dialect == 'sqlite':
+        statement = sqlite_insert(table).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=['id'],
+            set_={key: statement.excluded[key] for key in update_columns}
+        )
+    return table.insert().values(rows)
+
+
+def _write_chunk(table, rows):
+    new_rows = [{key: value for key, value in row.items() if key != 'id'} for row in rows if row['id'] is None]
+    existing_rows = [row for row in rows if row['id'] is not None]
+    if new_rows:
+        db.session.execute(table.insert().values(new_rows))
+    if existing_rows:
+        db.session.execute(_upsert_statement(table, existing_rows))
+    db.session.commit()
+
+
+def bulk_upsert(model, items, build_row, chunk_size):
+    report = {'processed': len(items), 'written': 0, 'failed': 0, 'errors': []}
+    valid = []
+
+    for position, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('Expected an object')
+            row = build_row(item)
+        except (ValueError, TypeError) as e:
+            report['errors'].append({'row': position, 'error': str(e)})
+            continue
+        row['updated_at'] = datetime.utcnow()
+        valid.append((position, row))
+
+    table = model.__table__
+    chunks = [valid[start:start + chunk_size] for start in reversed(range(0, len(valid), chunk_size))]
+    while chunks:
+        chunk = chunks.pop()
+        try:
+            _write_chunk(table, [row for _, row in chunk])
+            report['written'] += len(chunk)
+        except Exception as e:
+            db.session.rollback()
+            # a rejected chunk is halved until the rows that fail on their own are isolated, so each
+            # error is reported against its row; a lost connection fails the chunk as it is
+            if len(chunk) > 1 and not is_transient(e):
+                middle = len(chunk) // 2
+                chunks += [chunk[middle:], chunk[:middle]]
+                continue
+            error = str(getattr(e, 'orig', e))
+            report['errors'].extend({'row': position, 'error': error} for position, _ in chunk)
+
+    report['failed'] = len(report['errors'])
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+
+def import_tours(items, chunk_size):
+    return bulk_upsert(Tour, items, tour_row, chunk_size)
+
+
+def import_cars(items, chunk_size):
+    return bulk_upsert(Car, items, car_row, chunk_size)
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class NullCacheBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class LRUCacheBackend:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    def __init__(self, url, prefix='pinguino:cache:'):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        return self._redis.get(self._prefix + key)
+
+    def set(self, key, value, ttl):
+        self._redis.set(self._prefix + key, value, ex=ttl)
+
+    def clear(self):
+        for key in self._redis.scan_iter(f'{self._prefix}*'):
+            self._redis.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self._redis.scan_iter(f'{self._prefix}resp:*'))
+
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = NullCacheBackend()
+        self.ttl = 0
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        backend = app.config['CACHE_BACKEND']
+        if backend == 'redis':
+            self.backend = RedisCacheBackend(app.config['CACHE_REDIS_URL'])
+        elif backend == 'lru':
+            self.backend = LRUCacheBackend(app.config['CACHE_MAX_ENTRIES'])
+        else:
+            self.backend = NullCacheBackend()
+        self.ttl = app.config['CACHE_TTL']
+
+        if not self._listening:
+            event.listen(Session, 'after_flush', _collect_flushed_tables)
+            event.listen(Session, 'do_orm_execute', _collect_executed_tables)
+            event.listen(Session, 'after_commit', _forget_changed_tables)
+            event.listen(Session, 'after_rollback', _forget_changed_tables)
+            self._listening = True
+
+    def cached(self, *models):
+        from extensions import table_versions
+
+        table_versions.track(*models)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                from utils.conditional import table_stamp
+
+                stamps = [(model.__tablename__, table_stamp(model)[0]) for model in models]
+                key = self.key(request.endpoint, request.view_args, request.args, stamps)
+                entry = self.lookup(request.endpoint, key)
+                if entry is not None:
+                    response = current_app.response_class(entry, mimetype='application/json')
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and response.mimetype == 'application/json':
+                    self.store(key, response.get_data())
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    # also used by the ASGI catalog routes, so both serving modes share entries. stamps are the
+    # (table, version) pairs the ETag is built from, shared by every worker, so a write anywhere
+    # moves all of them to a new key and entries of older versions age out of the LRU/TTL
+    def key(self, endpoint, view_args, args, stamps):
+        stamp = ','.join(f'{table}={version}' for table, version in stamps)
+        query = '&'.join(f'{name}={value}' for name, value in sorted(args.items(multi=True)))
+        return f'resp:{endpoint}:{view_args}:{stamp}:{query}'
+
+    def lookup(self, endpoint, key):
+        entry = self.backend.get(key)
+        self._count(endpoint, 'hits' if entry is not None else 'misses')
+        return entry
+
+    def store(self, key, body):
+        self.backend.set(key, body, self.ttl)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            endpoints = {}
+            for (endpoint, kind), value in self._stats.items():
+                endpoints.setdefault(endpoint, {'hits': 0, 'misses': 0})[kind] = value
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': sum(item['hits'] for item in endpoints.values()),
+            'misses': sum(item['misses'] for item in endpoints.values()),
+            'endpoints': endpoints
+        }
+
+    def _count(self, endpoint, kind):
+        with self._stats_lock:
+            self._stats[(endpoint, kind)] += 1
+
+
+def _collect_flushed_tables(session, flush_context):
+    tables = session.info.setdefault('changed_tables', set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None:
+            tables.add(table.name)
+
+
+def _collect_executed_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault('changed_tables', set()).add(table.name)
+
+
+def _forget_changed_tables(session):
+    session.info.pop('changed_tables', None)
@@ -0,0 +1,118 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+# facets whose selected values are alternatives (OR); every selected feature must be present (AND)
+DISJUNCTIVE = ('category', 'seats', 'transmission')
+FACETS = DISJUNCTIVE + ('features',)
+
+
+def iter_bits(bits):
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class CarFacetIndex:
+    # bit i stands for the i-th active car in (price, id) order, so walking set bits from the
+    # lowest yields matches already sorted by price and a price range is one contiguous mask
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        # cars, prices, bitsets, all-cars mask; replaced as one tuple so a search never sees half a rebuild
+        self._state = ([], [], {facet: {} for facet in FACETS}, 0)
+
+    def ensure_fresh(self):
+        # the car table version moves on every create, update, delete and bulk import, in this worker or
+        # any other; booking version bumps are Core statements on the connection and leave it alone
+        from models.car import Car
+        from utils.conditional import table_stamp
+
+        stamp = table_stamp(Car)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self.rebuild(stamp)
+
+    def rebuild(self, stamp=None):
+        from models.car import Car
+
+        cars = Car.query.filter(Car.is_active == True).order_by(Car.price_per_day, Car.id).all()
+        bitsets = {facet: defaultdict(int) for facet in FACETS}
+        for position, car in enumerate(cars):
+            bit = 1 << position
+            bitsets['category'][car.category] |= bit
+            bitsets['seats'][car.seats] |= bit
+            bitsets['transmission'][car.transmission] |= bit
+            for feature in {item.strip() for item in (car.features or '').split(',') if item.strip()}:
+                bitsets['features'][feature] |= bit
+
+        self._state = (
+            [car.to_dict() for car in cars],
+            [car.price_per_day for car in cars],
+            {facet: dict(values) for facet, values in bitsets.items()},
+            (1 << len(cars)) - 1
+        )
+        self._stamp = stamp
+
+    def search(self, selected, min_price=None, max_price=None, offset=0, limit=50):
+        # selected maps a facet to the chosen values; unknown values simply match nothing
+        self.ensure_fresh()
+        cars, prices, bitsets, everything = self._state
+
+        low = bisect_left(prices, min_price) if min_price is not None else 0
+        high = bisect_right(prices, max_price) if max_price is not None else len(prices)
+        price_mask = everything & ~((1 << low) - 1) & ((1 << high) - 1) if high > low else 0
+
+        masks = {}
+        for facet in DISJUNCTIVE:
+            if selected.get(facet):
+                mask = 0
+                for value in selected[facet]:
+                    mask |= bitsets[facet].get(value, 0)
+                masks[facet] = mask
+        features_mask = everything
+        for feature in selected.get('features') or ():
+            features_mask &= bitsets['features'].get(feature, 0)
+
+        base = price_mask & features_mask
+        matches = base
+        for mask in masks.values():
+            matches &= mask
+
+        counts = {}
+        for facet in DISJUNCTIVE:
+            # counts of a multi-select facet ignore its own selection, so the other options still show
+            # how many cars would match if they were picked as well
+            others = base
+            for other, mask in masks.items():
+                if other != facet:
+                    others &= mask
+            counts[facet] = self._counts(bitsets[facet], others)
+        counts['features'] = self._counts(bitsets['features'], matches)
+
+        page = []
+        for position in iter_bits(matches):
+            if offset:
+                offset -= 1
+                continue
+            page.append(cars[position])
+            if len(page) >= limit:
+                break
+
+        return {
+            'items': page,
+            'total': matches.bit_count(),
+            'facets': counts,
+            'priceRange': {'min': prices[0], 'max': prices[-1]} if prices else None
+        }
+
+    @staticmethod
+    def _counts(values, mask):
+        counts = {}
+        for value, bits in values.items():
+            count = (bits & mask).bit_count()
+            if count:
+                counts[str(value)] = count
+        return counts
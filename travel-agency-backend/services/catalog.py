@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import String, case, select
+from extensions import tour_search
+from models.car import Car
+from models.inquiry import Inquiry
+from models.newsletter import Newsletter
+from models.newsletter_interest import NewsletterInterest
+from models.tour import Tour
+
+logger = logging.getLogger(__name__)
+
+# filters and form rows shared by the Flask blueprints and the ASGI routes
+
+
+def _parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        logger.info('Invalid %s format: %s', name, value)
+        return None
+
+
+def tour_listing(args):
+    # (filters, sort column); filters None means the text search matched nothing, so there is no need to
+    # query at all. a text search lists by relevance: the sort column is each tour's rank position
+    filters = []
+    sort_column = Tour.start_date
+
+    if args.get('admin', 'false') != 'true':
+        filters.append(Tour.is_active == True)
+
+    if args.get('featured', 'false') == 'true':
+        filters.append(Tour.is_featured == True)
+
+    search_query = args.get('q', '').strip()
+    if search_query:
+        matching_ids = tour_search.search(search_query, limit=current_app.config['SEARCH_MAX_RESULTS'])
+        if not matching_ids:
+            return None, sort_column
+        filters.append(Tour.id.in_(matching_ids))
+        sort_column = case({tour_id: rank for rank, tour_id in enumerate(matching_ids)}, value=Tour.id)
+
+    start_date = _parse_date(args.get('startDate'), 'start_date')
+    if start_date:
+        filters.append(Tour.start_date >= start_date)
+
+    end_date = _parse_date(args.get('endDate'), 'end_date')
+    if end_date:
+        filters.append(Tour.end_date <= end_date)
+
+    guests = args.get('guests')
+    if guests:
+        try:
+            filters.append(Tour.capacity >= int(guests))
+        except ValueError:
+            pass
+
+    return filters, sort_column
+
+
+def car_filters(args):
+    if args.get('admin', 'false') == 'true':
+        return []
+    return [Car.is_active == True]
+
+
+def checked_row(model, row):
+    # rejected here with a 400 instead of by MySQL strict mode, long after a write-behind post was accepted
+    for name, value in row.items():
+        column_type = model.__table__.c[name].type
+        if value is None or not isinstance(column_type, String):
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f'{name} must be a string')
+        if column_type.length and len(value) > column_type.length:
+            raise ValueError(f'{name} must be at most {column_type.length} characters')
+    return row
+
+
+def inquiry_row(data):
+    if not data.get('email') or not data.get('itemTitle'):
+        raise ValueError('Missing required fields')
+    return checked_row(Inquiry, {
+        'email': data['email'],
+        'item_type': data.get('type', 'unknown'),
+        'item_id': str(data.get('id', '0')),
+        'item_title': data['itemTitle'],
+        'status': 'new',
+        'created_at': datetime.utcnow()
+    })
+
+
+def subscriber_row(data):
+    if not data.get('email'):
+        raise ValueError('Missing required fields')
+    return checked_row(Newsletter, {
+        'email': data['email'],
+        'first_name': data.get('firstName', ''),
+        'last_name': data.get('lastName', ''),
+        'interests': ','.join(interest_list(data.get('interests', []))),
+        'created_at': datetime.now()
+    })
+
+
+def interest_list(values):
+    # one spelling per interest, so the text column and the newsletter_interest rows agree
+    if not isinstance(values, list):
+        raise ValueError('interests must be a list')
+    interests = {str(value).strip().lower()[:50] for value in values}
+    return sorted(interest for interest in interests if interest and ',' not in interest)
+
+
+def subscriber_insert():
+    # duplicates (already subscribed, or twice in one batch) are dropped by the unique email index
+    return Newsletter.__table__.insert() \
+        .prefix_with('IGNORE', dialect='mysql') \
+        .prefix_with('OR IGNORE', dialect='sqlite')
+
+
+def stored_interests(emails):
+    # read back what the subscriber insert kept, an existing subscriber keeps the interests they had
+    return select(Newsletter.id, Newsletter.interests).where(Newsletter.email.in_(emails))
+
+
+def interest_rows(subscribers):
+    return [
+        {'newsletter_id': subscriber_id, 'interest': interest}
+        for subscriber_id, interests in subscribers
+        for interest in (interests or '').split(',') if interest
+    ]
+
+
+def interest_insert():
+    return NewsletterInterest.__table__.insert() \
+        .prefix_with('IGNORE', dialect='mysql') \
+        .prefix_with('OR IGNORE', dialect='sqlite')
@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from sqlalchemy import exc, text
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'size': self.size(),
+                'checkedIn': self.checkedin(),
+                'checkedOut': self.checkedout(),
+                'overflow': max(self.overflow(), 0),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'waitTotalMs': round(self.wait_total * 1000, 3),
+                'waitAvgMs': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'waitMaxMs': round(self.wait_max * 1000, 3)
+            }
+
+
+def _engine_options(config, url):
+    if url.startswith('sqlite') and (':memory:' in url or url.rstrip('/') == 'sqlite:'):
+        return {}
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
+
+
+def validate_pool_config(config):
+    errors = []
+    if config['DB_POOL_SIZE'] < 1:
+        errors.append('DB_POOL_SIZE must be at least 1')
+    if config['DB_MAX_OVERFLOW'] < -1:
+        errors.append('DB_MAX_OVERFLOW must be -1 (unlimited) or more')
+    if config['DB_POOL_RECYCLE'] == 0 or config['DB_POOL_RECYCLE'] < -1:
+        errors.append('DB_POOL_RECYCLE must be positive seconds or -1 (disabled)')
+    if config['DB_POOL_TIMEOUT'] <= 0:
+        errors.append('DB_POOL_TIMEOUT must be positive')
+    if errors:
+        raise ValueError('Invalid database pool configuration: ' + '; '.join(errors))
+
+
+def configure_engines(app):
+    config = app.config
+    validate_pool_config(config)
+
+    options = _engine_options(config, config['SQLALCHEMY_DATABASE_URI'])
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    for index, url in enumerate(config['DB_REPLICA_URLS']):
+        binds[f'replica_{index}'] = {'url': url, **_engine_options(config, url)}
+    config['SQLALCHEMY_BINDS'] = binds
+
+
+def check_server_timeouts(db):
+    engine = db.engine
+    if engine.dialect.name != 'mysql':
+        return
+    recycle = engine.pool._recycle
+    with engine.connect() as connection:
+        wait_timeout = connection.execute(text('SELECT @@wait_timeout')).scalar()
+    if recycle < 0 or recycle >= wait_timeout:
+        logger.warning(
+            'DB_POOL_RECYCLE (%s s) is not below the MySQL wait_timeout (%s s); '
+            'idle connections may be dropped by the server', recycle, wait_timeout
+        )
+
+
+def pool_stats(db):
+    stats = {}
+    for bind_key, engine in db.engines.items():
+        pool = engine.pool
+        name = bind_key or 'default'
+        if isinstance(pool, InstrumentedQueuePool):
+            stats[name] = pool.stats()
+        else:
+            stats[name] = {'status': pool.status()}
+    return stats
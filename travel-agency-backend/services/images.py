@@ -0,0 +1,357 @@
+import fcntl
+import hashlib
+import hmac
+import http.client
+import io
+import ipaddress
+import logging
+import os
+import socket
+import tempfile
+import time
+from urllib.parse import quote, urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+# magic bytes of originals served as-is when Pillow is not installed
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF8', 'image/gif'),
+    (b'RIFF', 'image/webp'),
+]
+MAX_REDIRECTS = 3
+
+
+class ImageError(Exception):
+    def __init__(self, message, status=502):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff_mimetype(data):
+    for signature, mimetype in SIGNATURES:
+        if data.startswith(signature):
+            return mimetype
+    return None
+
+
+class DiskLRU:
+    # files under root, evicted oldest-mtime first once they outgrow max_bytes; hits refresh the mtime.
+    # the byte total lives in a flock-ed file under root, so every worker sharing the directory adds
+    # its writes to the same count and one eviction at a time brings all of them back under the limit
+    TOUCH_AFTER = 60
+    USAGE_FILE = '.usage'
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def reader(self, path):
+        # an open handle keeps serving the bytes even if another worker evicts the file right after
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        if time.time() - os.fstat(handle.fileno()).st_mtime > self.TOUCH_AFTER:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return handle
+
+    def read(self, path):
+        handle = self.reader(path)
+        if handle is None:
+            return None
+        with handle:
+            return handle.read()
+
+    def put(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written aside and renamed, so readers never see half a file
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        with os.fdopen(handle, 'wb') as target:
+            target.write(data)
+        os.replace(temporary, path)
+
+        with open(self.path(self.USAGE_FILE), 'a+', encoding='ascii') as usage:
+            fcntl.flock(usage, fcntl.LOCK_EX)
+            usage.seek(0)
+            recorded = usage.read().strip()
+            # the first writer counts what is on disk, the file just written included
+            total = int(recorded) + len(data) if recorded else sum(size for _, size, _ in self._files())
+            if total > self.max_bytes:
+                total = self._evict()
+            usage.seek(0)
+            usage.truncate()
+            usage.write(str(total))
+
+    def stats(self):
+        files = list(self._files())
+        return {'files': len(files), 'bytes': sum(size for _, size, _ in files), 'maxBytes': self.max_bytes}
+
+    def _files(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                # the usage file and files still being written are not cache entries
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, info.st_size, info.st_mtime
+
+    def _evict(self):
+        # down to 90% so the next few writes do not rescan the directory again; the scan also corrects
+        # the recorded total for overwrites and files removed by hand
+        files = sorted(self._files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+
+def _checked_address(host, allowed_hosts):
+    # every address the name resolves to must be public, and the connection goes to the checked one,
+    # so neither an internal host name nor a DNS answer that changes between check and connect gets through
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)}
+    except socket.gaierror:
+        raise ImageError(f'Cannot resolve {host}')
+    if host not in allowed_hosts:
+        for address in addresses:
+            if not ipaddress.ip_address(address.split('%')[0]).is_global:
+                raise ImageError(f'{host} is not a public address', 403)
+    return sorted(addresses)[0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, host, address, **kwargs):
+        super().__init__(host, **kwargs)
+        self._address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self._address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, host, address, **kwargs):
+        super().__init__(host, **kwargs)
+        self._address = address
+
+    def connect(self):
+        sock = socket.create_connection((self._address, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+class ImageProxy:
+    def __init__(self):
+        self.enabled = False
+        self.cache = DiskLRU('', 0)
+        self.widths = (320, 640, 1024, 1600)
+        self.default_width = 640
+        self.format = 'webp'
+        self.quality = 80
+        self.fetch_timeout = 5.0
+        self.max_source_bytes = 15 * 1024 * 1024
+        self.source_ttl = 86400
+        self.local_root = None
+        self.allowed_hosts = frozenset()
+        self.public_url = ''
+        self._key = b''
+        self._warned = False
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config['IMAGE_PROXY_ENABLED']
+        self.cache = DiskLRU(config['IMAGE_CACHE_DIR'], config['IMAGE_CACHE_MAX_BYTES'])
+        self.widths = tuple(sorted(config['IMAGE_WIDTHS']))
+        self.default_width = config['IMAGE_DEFAULT_WIDTH']
+        self.format = config['IMAGE_FORMAT']
+        self.quality = config['IMAGE_QUALITY']
+        self.fetch_timeout = config['IMAGE_FETCH_TIMEOUT']
+        self.max_source_bytes = config['IMAGE_MAX_SOURCE_BYTES']
+        self.source_ttl = config['IMAGE_SOURCE_TTL']
+        self.local_root = os.path.realpath(config['IMAGE_LOCAL_ROOT']) if config['IMAGE_LOCAL_ROOT'] else None
+        self.allowed_hosts = frozenset(config['IMAGE_ALLOWED_HOSTS'])
+        self.public_url = config['IMAGE_PUBLIC_URL'].rstrip('/')
+        self._key = (config['IMAGE_SIGNING_KEY'] or config['JWT_SECRET_KEY']).encode()
+
+    # --- URLs handed out by to_dict() ---
+
+    def sign(self, src):
+        return hmac.new(self._key, src.encode(), hashlib.sha256).hexdigest()[:20]
+
+    def verify(self, src, signature):
+        return hmac.compare_digest(self.sign(src), signature or '')
+
+    def url(self, src, width, image_format=None):
+        return (f'{self.public_url}/api/images/{width}.{image_format or self.format}'
+                f'?src={quote(src, safe="")}&sig={self.sign(src)}')
+
+    def src(self, image_url):
+        if not image_url or not self.enabled:
+            return image_url or None
+        return self.url(image_url, self.default_width)
+
+    def srcset(self, image_url):
+        if not image_url or not self.enabled:
+            return None
+        return ', '.join(f'{self.url(image_url, width)} {width}w' for width in self.widths)
+
+    def snap_width(self, width):
+        # a fixed set of widths keeps the number of variants per original bounded
+        for candidate in self.widths:
+            if candidate >= width:
+                return candidate
+        return self.widths[-1]
+
+    # --- serving ---
+
+    def variant(self, src, width, image_format):
+        # returns (file object, mimetype, etag); a hit is an open cache file, a miss the bytes just produced,
+        # so an eviction by another worker never pulls a file from under the response
+        if image_format not in FORMATS:
+            raise ImageError(f'Unsupported format: {image_format}', 400)
+        width = self.snap_width(width)
+
+        try:
+            from PIL import Image
+        except ImportError:
+            if not self._warned:
+                logger.warning('Pillow is not installed, images are served without resizing')
+                self._warned = True
+            digest, original = self._original(src)
+            mimetype = sniff_mimetype(original)
+            if mimetype is None:
+                raise ImageError('Source is not a supported image', 415)
+            return io.BytesIO(original), mimetype, digest
+
+        # a hit needs only the digest, the original is read on a miss
+        digest = self._known_digest(src)
+        if digest:
+            key = self._variant_key(digest, width, image_format)
+            handle = self.cache.reader(self.cache.path('variants', key[:2], f'{key}.{image_format}'))
+            if handle is not None:
+                return handle, FORMATS[image_format], key
+
+        digest, original = self._original(src)
+        key = self._variant_key(digest, width, image_format)
+        data = self._render(Image, original, width, image_format)
+        self.cache.put(self.cache.path('variants', key[:2], f'{key}.{image_format}'), data)
+        return io.BytesIO(data), FORMATS[image_format], key
+
+    def stats(self):
+        return {'enabled': self.enabled, 'widths': list(self.widths), **self.cache.stats()}
+
+    def _variant_key(self, digest, width, image_format):
+        return hashlib.sha256(f'{digest}:{width}:{image_format}:{self.quality}'.encode()).hexdigest()
+
+    def _source_path(self, src):
+        return self.cache.path('sources', hashlib.sha256(src.encode()).hexdigest())
+
+    def _known_digest(self, src):
+        # src -> content digest is remembered for source_ttl
+        source_path = self._source_path(src)
+        try:
+            if time.time() - os.stat(source_path).st_mtime >= self.source_ttl:
+                return None
+            with open(source_path) as handle:
+                return handle.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _original(self, src):
+        # the bytes are stored under their digest, so identical images behind different URLs
+        # are fetched and resized once
+        digest = self._known_digest(src)
+        if digest:
+            data = self.cache.read(self.cache.path('originals', digest[:2], digest))
+            if data is not None:
+                return digest, data
+
+        data = self._load(src)
+        digest = hashlib.sha256(data).hexdigest()
+        self.cache.put(self.cache.path('originals', digest[:2], digest), data)
+        self.cache.put(self._source_path(src), digest.encode())
+        return digest, data
+
+    def _load(self, src):
+        if src.startswith(('http://', 'https://')):
+            return self._fetch(src)
+        if self.local_root and src.startswith('/'):
+            path = os.path.realpath(os.path.join(self.local_root, src.lstrip('/')))
+            if os.path.commonpath([path, self.local_root]) != self.local_root:
+                raise ImageError('Path outside the image root', 403)
+            try:
+                if os.path.getsize(path) > self.max_source_bytes:
+                    raise ImageError('Source image too large', 413)
+                with open(path, 'rb') as handle:
+                    return handle.read()
+            except (FileNotFoundError, IsADirectoryError):
+                raise ImageError('Source image not found', 404)
+        raise ImageError('Unsupported image source', 400)
+
+    def _fetch(self, url):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ('http', 'https') or not parts.hostname:
+                raise ImageError('Unsupported image source', 400)
+            address = _checked_address(parts.hostname, self.allowed_hosts)
+            connection_class = _PinnedHTTPSConnection if parts.scheme == 'https' else _PinnedHTTPConnection
+            connection = connection_class(parts.hostname, address, port=parts.port, timeout=self.fetch_timeout)
+            try:
+                path = parts.path or '/'
+                connection.request('GET', f'{path}?{parts.query}' if parts.query else path,
+                                   headers={'Accept': 'image/*', 'User-Agent': 'pinguino-image-proxy'})
+                response = connection.getresponse()
+                if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+                    url = urljoin(url, response.getheader('Location'))
+                    continue
+                if response.status != 200:
+                    raise ImageError(f'Source answered {response.status}')
+                if not (response.getheader('Content-Type') or '').startswith('image/'):
+                    raise ImageError('Source is not an image', 415)
+                data = response.read(self.max_source_bytes + 1)
+                if len(data) > self.max_source_bytes:
+                    raise ImageError('Source image too large', 413)
+                return data
+            except (OSError, http.client.HTTPException) as e:
+                raise ImageError(f'Cannot fetch source: {e}')
+            finally:
+                connection.close()
+        raise ImageError('Too many redirects')
+
+    def _render(self, Image, data, width, image_format):
+        from PIL import ImageOps, UnidentifiedImageError
+
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                # JPEG can decode straight at a fraction of the size, far cheaper than a full decode
+                image.draft('RGB', (width, width * 4))
+                image = ImageOps.exif_transpose(image)
+                if image.width > width:
+                    image.thumbnail((width, image.height), Image.LANCZOS)
+                if image_format == 'jpeg' and image.mode != 'RGB':
+                    image = image.convert('RGB')
+                elif image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                output = io.BytesIO()
+                image.save(output, format=image_format.upper(), quality=self.quality)
+                return output.getvalue()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise ImageError('Source is not a supported image', 415)
@@ -0,0 +1,143 @@
+from collections import Counter
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def rollup_key(created_at, item_type, item_id, status):
+    if created_at is None:
+        return None
+    return created_at.date(), item_type, str(item_id), status or 'new'
+
+
+def _previous(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return state.attrs[key].value
+
+
+KEY_COLUMNS = ('created_at', 'item_type', 'item_id', 'status')
+
+
+class InquiryRollups:
+    # daily counts per (item_type, item_id, status), kept in step with every inquiry write
+    def __init__(self):
+        self._listening = False
+
+    def init_app(self, app):
+        if not self._listening:
+            event.listen(Session, 'after_flush', self._apply_flushed)
+            self._listening = True
+
+    def _apply_flushed(self, session, flush_context):
+        from models.inquiry import Inquiry
+
+        deltas = Counter()
+        for inquiry in session.new:
+            if isinstance(inquiry, Inquiry):
+                deltas[rollup_key(*(getattr(inquiry, key) for key in KEY_COLUMNS))] += 1
+
+        for inquiry in session.deleted:
+            if isinstance(inquiry, Inquiry):
+                state = inspect(inquiry)
+                deltas[rollup_key(*(_previous(state, key) for key in KEY_COLUMNS))] -= 1
+
+        for inquiry in session.dirty:
+            if not isinstance(inquiry, Inquiry) or not session.is_modified(inquiry):
+                continue
+            state = inspect(inquiry)
+            deltas[rollup_key(*(_previous(state, key) for key in KEY_COLUMNS))] -= 1
+            deltas[rollup_key(*(getattr(inquiry, key) for key in KEY_COLUMNS))] += 1
+
+        apply_deltas(session.connection(), deltas)
+
+    def add_rows(self, connection, rows):
+        # Core inserts (the write-behind batch) bypass the flush, so they are counted here
+        apply_deltas(connection, Counter(
+            rollup_key(row['created_at'], row['item_type'], row['item_id'], row.get('status')) for row in rows
+        ))
+
+
+def apply_deltas(connection, deltas):
+    from models.inquiry_rollup import InquiryDailyRollup
+
+    rows = [
+        {'day': key[0], 'item_type': key[1], 'item_id': key[2], 'status': key[3], 'count': delta}
+        for key, delta in sorted((key, delta) for key, delta in deltas.items() if key is not None and delta)
+    ]
+    if not rows:
+        return
+    table = InquiryDailyRollup.__table__
+    statement = increment_statement(connection.dialect.name, table)
+    if statement is not None:
+        connection.execute(statement, rows)
+        return
+    # no upsert on this dialect: bump the existing rows and insert the missing ones
+    for row in rows:
+        key = [table.c[column] == row[column] for column in ('day', 'item_type', 'item_id', 'status')]
+        result = connection.execute(table.update().where(*key).values(count=table.c.count + row['count']))
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+def increment_statement(dialect, table):
+    # rows are touched in key order so concurrent writers lock them in the same order
+    if dialect == 'mysql':
+        statement = mysql_insert(table)
+        return statement.on_duplicate_key_update(count=table.c.count + statement.inserted['count'])
+    if dialect == 'sqlite':
+        statement = sqlite_insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=['day', 'item_type', 'item_id', 'status'],
+            set_={'count': table.c.count + statement.excluded['count']}
+        )
+    return None
+
+
+def summary_statements(start, end, group_by, filters, top):
+    # start and end are inclusive days; group_by names rollup columns, filters maps column names to values.
+    # returns (total, groups or None, top items); the query audit explains the same statements
+    from models.inquiry_rollup import InquiryDailyRollup as Rollup
+
+    criteria = [Rollup.day >= start, Rollup.day <= end]
+    criteria.extend(getattr(Rollup, column) == value for column, value in filters.items())
+    total = func.sum(Rollup.count)
+    columns = [getattr(Rollup, column) for column in group_by]
+
+    return (
+        select(total).where(*criteria),
+        select(*columns, total).where(*criteria).group_by(*columns).order_by(*columns) if columns else None,
+        select(Rollup.item_type, Rollup.item_id, total).where(*criteria)
+        .group_by(Rollup.item_type, Rollup.item_id).order_by(total.desc(), Rollup.item_type, Rollup.item_id)
+        .limit(top)
+    )
+
+
+def summarize(session, start, end, group_by, filters, top):
+    total, groups, top_items = summary_statements(start, end, group_by, filters, top)
+    groups = session.execute(groups).all() if groups is not None else []
+    top_items = session.execute(top_items).all()
+
+    return {
+        'total': int(session.execute(total).scalar() or 0),
+        'groups': [(row[:-1], int(row[-1])) for row in groups if row[-1]],
+        'topItems': [(item_type, item_id, int(count)) for item_type, item_id, count in top_items if count]
+    }
+
+
+def rebuild(session):
+    from models.inquiry import Inquiry
+    from models.inquiry_rollup import InquiryDailyRollup
+
+    table = InquiryDailyRollup.__table__
+    day = func.date(Inquiry.created_at)
+    status = func.coalesce(Inquiry.status, 'new')
+    source = select(day, Inquiry.item_type, Inquiry.item_id, status, func.count()).where(
+        Inquiry.created_at.isnot(None)
+    ).group_by(day, Inquiry.item_type, Inquiry.item_id, status)
+
+    session.execute(delete(table))
+    session.execute(insert(table).from_select(['day', 'item_type', 'item_id', 'status', 'count'], source))
+    return session.execute(select(func.count()).select_from(table)).scalar()
@@ -0,0 +1,190 @@
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class RequestMetrics:
+    HISTOGRAMS = {
+        'http_request_duration_seconds': ('Request latency', LATENCY_BUCKETS),
+        'http_request_sql_queries': ('SQL statements executed per request', QUERY_BUCKETS),
+        'http_request_sql_duration_seconds': ('Time spent in SQL per request', LATENCY_BUCKETS),
+        'http_response_serialization_seconds': ('Time spent encoding JSON responses', LATENCY_BUCKETS),
+        'http_response_size_bytes': ('Response body size', SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._requests = Counter()
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config['METRICS_ENABLED']
+        self.query_threshold = app.config['METRICS_QUERY_THRESHOLD']
+        self.profile_rate = app.config['PROFILE_SAMPLE_RATE']
+        self.profile_slow = app.config['PROFILE_SLOW_MS'] / 1000
+        self.profile_dir = app.config['PROFILE_DIR']
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.json.response = self._timed(app.json.response)
+
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._listening = True
+
+    def render(self):
+        lines = [
+            '# HELP http_requests_total Requests handled',
+            '# TYPE http_requests_total counter'
+        ]
+        with self._lock:
+            for labels, value in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{_labels(labels)} {value}')
+
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in histogram.samples():
+                        lines.append(f'{name}_bucket{_labels(labels, le=bound)} {count}')
+                    lines.append(f'{name}_sum{_labels(labels)} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{_labels(labels)} {sum(histogram.counts)}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+
+    def _observe(self, name, labels, value):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(self.HISTOGRAMS[name][1])
+        histogram.observe(value)
+
+    def _start_request(self):
+        g.metrics = {'started': time.perf_counter(), 'queries': 0, 'sql_time': 0.0,
+                     'serialization': 0.0, 'statements': Counter(), 'profiler': None}
+        if self.profile_rate and random.random() < self.profile_rate:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            g.metrics['profiler'] = profiler
+
+    def _finish_request(self, response):
+        metrics = g.pop('metrics', None)
+        if metrics is None:
+            return response
+
+        elapsed = time.perf_counter() - metrics['started']
+        endpoint = request.endpoint or 'unmatched'
+        labels = (('endpoint', endpoint), ('method', request.method))
+        size = response.calculate_content_length()
+
+        with self._lock:
+            self._requests[(*labels, ('status', str(response.status_code)))] += 1
+            self._observe('http_request_duration_seconds', labels, elapsed)
+            self._observe('http_request_sql_queries', labels, metrics['queries'])
+            self._observe('http_request_sql_duration_seconds', labels, metrics['sql_time'])
+            if metrics['serialization']:
+                self._observe('http_response_serialization_seconds', labels, metrics['serialization'])
+            if size is not None:
+                self._observe('http_response_size_bytes', labels, size)
+
+        if metrics['queries'] > self.query_threshold:
+            statement, repeats = metrics['statements'].most_common(1)[0]
+            logger.warning(
+                'Possible N+1 on %s %s: %d queries (%.1f ms), most repeated x%d: %s',
+                request.method, request.full_path, metrics['queries'], metrics['sql_time'] * 1000,
+                repeats, ' '.join(statement.split())[:200]
+            )
+
+        profiler = metrics['profiler']
+        if profiler is not None:
+            profiler.disable()
+            if elapsed >= self.profile_slow:
+                self._dump_profile(profiler, endpoint, elapsed)
+
+        response.headers['Server-Timing'] = (
+            f"sql;dur={metrics['sql_time'] * 1000:.1f}, "
+            f"serialize;dur={metrics['serialization'] * 1000:.1f}, "
+            f'total;dur={elapsed * 1000:.1f}'
+        )
+        return response
+
+    def _dump_profile(self, profiler, endpoint, elapsed):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f'{endpoint}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.prof')
+        profiler.dump_stats(path)
+        logger.info('Slow request %s took %.0f ms, profile written to %s', request.full_path, elapsed * 1000, path)
+
+    def _timed(self, respond):
+        def response(*args, **kwargs):
+            started = time.perf_counter()
+            result = respond(*args, **kwargs)
+            metrics = g.get('metrics')
+            if metrics is not None:
+                metrics['serialization'] += time.perf_counter() - started
+            return result
+        return response
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, which dies with the statement, so one that raises leaves nothing behind
+    if context is not None and has_request_context() and 'metrics' in g:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_start', None)
+    if started is None or not has_request_context():
+        return
+    metrics = g.get('metrics')
+    elapsed = time.perf_counter() - started
+    if metrics is not None:
+        metrics['queries'] += 1
+        metrics['sql_time'] += elapsed
+        metrics['statements'][statement] += 1
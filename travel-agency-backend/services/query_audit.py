@@ -0,0 +1,185 @@
+import json
+from datetime import date, timedelta
+from sqlalchemy import false, func, select
+from werkzeug.datastructures import MultiDict
+from utils.pagination import encode_cursor, page_columns, page_request, paginate_statement
+
+# plan findings that make a route slower as its table grows
+ISSUES = ('full_scan', 'filesort', 'temporary')
+
+
+def _page(model, sort_column, statement, args=None, descending=False):
+    page = page_request(model, sort_column, MultiDict(args or {}))
+    statement = statement.with_only_columns(*page_columns(model, sort_column, page))
+    return paginate_statement(statement, model, sort_column, page, descending)
+
+
+def representative_queries():
+    # (endpoint, case, statement): the statements the list and lookup routes issue, built with the same
+    # filter and pagination helpers so an index change shows up here exactly as it would in the route
+    from models.car import Car
+    from models.car_booking import CarBooking
+    from models.inquiry import Inquiry
+    from models.insurance import Insurance
+    from models.newsletter import Newsletter
+    from models.review import Review
+    from models.tour import Tour
+    from models.user import User
+    from services.catalog import car_filters, tour_listing
+    from services.inquiry_rollups import summary_statements
+    from services.segments import interest_count_statement, segment_filter
+    from utils.conditional import stamp_statement
+
+    today = date.today()
+    tour_cursor = encode_cursor(today, 1)
+    segment, terms = segment_filter('beach AND culture NOT cars')
+    # the analytics defaults: the last 30 days grouped by day and status, top 10 items
+    total, groups, top_items = summary_statements(today - timedelta(days=29), today, ['day', 'status'], {}, 10)
+
+    def tours(args):
+        filters, sort_column = tour_listing(MultiDict(args))
+        # a text search that matches nothing never reaches the database
+        return _page(Tour, sort_column, select(Tour).where(*filters) if filters is not None else select(Tour)
+                     .where(false()), args)
+
+    def cars(args):
+        return _page(Car, Car.price_per_day, select(Car).where(*car_filters(MultiDict(args))), args)
+
+    return [
+        ('tours.get_tours', 'public', tours({})),
+        ('tours.get_tours', 'public page', tours({'limit': '20', 'cursor': tour_cursor})),
+        ('tours.get_tours', 'admin', tours({'admin': 'true', 'limit': '20'})),
+        ('tours.get_tours', 'featured', tours({'featured': 'true', 'limit': '20'})),
+        # relevance order over at most SEARCH_MAX_RESULTS ids, sorted after the primary key lookups
+        ('tours.get_tours', 'text search', tours({'q': 'beach', 'limit': '20'})),
+        ('tours.get_tours', 'dates and guests', tours({
+            'startDate': today.isoformat(), 'endDate': (today + timedelta(days=60)).isoformat(),
+            'guests': '4', 'limit': '20'
+        })),
+        ('tours.get_tour', 'by id', select(Tour).where(Tour.id == 1)),
+        ('reviews.get_reviews', 'public', select(Review).where(Review.is_active == True)
+            .order_by(Review.created_at.desc()).limit(3)),
+        ('reviews.get_reviews', 'admin', _page(Review, Review.created_at, select(Review), {'limit': '50'}, True)),
+        ('cars.get_cars', 'public', cars({'limit': '12'})),
+        ('cars.get_cars', 'admin', cars({'admin': 'true', 'limit': '12'})),
+        ('cars.get_available_cars', 'candidates', select(Car.id).where(Car.is_active == True, Car.seats >= 4)
+            .order_by(Car.price_per_day, Car.id)),
+        ('cars.create_booking', 'overlap check', select(CarBooking.id).where(
+            CarBooking.car_id == 1, CarBooking.status == 'confirmed',
+            CarBooking.start_date < today + timedelta(days=7), CarBooking.end_date > today
+        ).limit(1)),
+        ('cars.get_bookings', 'admin', _page(CarBooking, CarBooking.start_date, select(CarBooking), {'limit': '50'})),
+        ('cars.search_cars', 'index rebuild', select(Car).where(Car.is_active == True)
+            .order_by(Car.price_per_day, Car.id)),
+        ('insurances.get_insurances', 'all', select(Insurance).order_by(Insurance.id)),
+        ('newsletter.get_subscribers', 'admin',
+            _page(Newsletter, Newsletter.created_at, select(Newsletter), {'limit': '50'})),
+        ('newsletter.subscribe', 'email lookup', select(Newsletter).where(Newsletter.email == 'a@example.com')),
+        ('newsletter.segment_count', 'segment', select(func.count(Newsletter.id)).where(segment)),
+        ('newsletter.segment_count', 'interest counts', interest_count_statement(terms)),
+        ('inquiries.get_inquiries', 'admin',
+            _page(Inquiry, Inquiry.created_at, select(Inquiry), {'limit': '50'}, True)),
+        ('inquiries.get_analytics', 'total', total),
+        ('inquiries.get_analytics', 'groups', groups),
+        ('inquiries.get_analytics', 'top items', top_items),
+        ('auth.login', 'username lookup', select(User).where(User.username == 'admin')),
+        ('tours.get_tours', 'etag stamp', stamp_statement(Tour)),
+    ]
+
+
+def _bounded(statement):
+    # ORDER BY ... LIMIT n read in index order stops after n rows; without either a scan reads everything
+    return getattr(statement, '_limit_clause', None) is not None and bool(getattr(statement, '_order_by_clauses', ()))
+
+
+def _sqlite_issues(rows, bounded):
+    plan, issues, scans, accesses = [], set(), 0, 0
+    for row in rows:
+        detail = row[-1]
+        plan.append(detail)
+        if detail.startswith(('SCAN ', 'SEARCH ')) and 'CONSTANT ROW' not in detail:
+            accesses += 1
+            # a walk over a whole table or index, covering or not
+            scans += detail.startswith('SCAN ')
+        if 'TEMP B-TREE FOR ORDER BY' in detail or 'TEMP B-TREE FOR RIGHT PART OF ORDER BY' in detail:
+            issues.add('filesort')
+        if 'TEMP B-TREE FOR GROUP BY' in detail or 'TEMP B-TREE FOR DISTINCT' in detail:
+            issues.add('temporary')
+    # the one exception: a single ordered read the LIMIT stops early, nothing sorted behind it
+    if scans and not (bounded and accesses == 1 and 'filesort' not in issues):
+        issues.add('full_scan')
+    return plan, issues
+
+
+def _mysql_issues(rows, bounded):
+    plan, issues, scans = [], set(), 0
+    for row in rows:
+        row = dict(row._mapping)
+        extra = row.get('Extra') or ''
+        plan.append(f"{row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')} {extra}")
+        # ALL walks the table, index walks a whole index
+        scans += row.get('type') in ('ALL', 'index')
+        if 'Using filesort' in extra:
+            issues.add('filesort')
+        if 'Using temporary' in extra:
+            issues.add('temporary')
+    if scans and not (bounded and len(plan) == 1 and 'filesort' not in issues):
+        issues.add('full_scan')
+    return plan, issues
+
+
+# dialect -> (EXPLAIN prefix, plan reader)
+PLAN_READERS = {
+    'sqlite': ('EXPLAIN QUERY PLAN', _sqlite_issues),
+    'mysql': ('EXPLAIN', _mysql_issues),
+}
+
+
+def explain(connection, statement):
+    dialect = connection.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    prefix, read_plan = PLAN_READERS[dialect.name]
+    return read_plan(connection.exec_driver_sql(f'{prefix} {sql}').all(), _bounded(statement))
+
+
+def audit(connection):
+    results = []
+    for endpoint, case, statement in representative_queries():
+        plan, issues = explain(connection, statement)
+        results.append({
+            'key': f'{endpoint} [{case}]',
+            'issues': sorted(issues),
+            'plan': plan
+        })
+    return results
+
+
+def load_baseline(path, dialect):
+    try:
+        with open(path) as handle:
+            return json.load(handle).get(dialect, {})
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, dialect, results):
+    try:
+        with open(path) as handle:
+            baselines = json.load(handle)
+    except FileNotFoundError:
+        baselines = {}
+    baselines[dialect] = {result['key']: result['issues'] for result in results}
+    with open(path, 'w') as handle:
+        json.dump(baselines, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def regressions(results, baseline):
+    # without a baseline every finding counts; with one only findings the baseline did not accept
+    found = []
+    for result in results:
+        accepted = set((baseline or {}).get(result['key'], ()))
+        new = [issue for issue in result['issues'] if issue not in accepted]
+        if new:
+            found.append((result['key'], new))
+    return found
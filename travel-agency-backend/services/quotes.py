@@ -0,0 +1,211 @@
+import itertools
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+CENT = Decimal('0.01')
+
+
+class QuoteError(ValueError):
+    pass
+
+
+def money(value):
+    return value.quantize(CENT, ROUND_HALF_UP)
+
+
+def parse_seasons(raw):
+    # "06-15:08-31:1.25,12-20:01-06:1.15"; a period may wrap around new year
+    seasons = []
+    for part in filter(None, (item.strip() for item in (raw or '').split(','))):
+        start, end, multiplier = part.split(':')
+        seasons.append((start, end, Decimal(multiplier)))
+    return tuple(seasons)
+
+
+class SeasonCalendar:
+    def __init__(self, seasons=()):
+        self.seasons = seasons
+
+    def multiplier(self, day):
+        key = day.strftime('%m-%d')
+        for start, end, multiplier in self.seasons:
+            if (start <= key <= end) if start <= end else (key >= start or key <= end):
+                return multiplier
+        return Decimal('1')
+
+    @lru_cache(maxsize=4096)
+    def day_factor(self, start, end):
+        # sum of the multipliers of every rented day, so a daily rate times this is the seasonal subtotal
+        return sum((self.multiplier(start + timedelta(days=offset)) for offset in range((end - start).days)),
+                   Decimal('0'))
+
+
+class PriceTables:
+    # car and insurance rates as Decimals, reloaded when the car or insurance table version changes
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamps = None
+        self.cars = []
+        self.insurances = []
+
+    def current(self):
+        from models.car import Car
+        from models.insurance import Insurance
+        from utils.conditional import table_stamp
+
+        stamps = (table_stamp(Car), table_stamp(Insurance))
+        if stamps != self._stamps:
+            with self._lock:
+                if stamps != self._stamps:
+                    self._load(stamps)
+        return self
+
+    def _load(self, stamps):
+        from extensions import db
+        from models.car import Car
+        from models.insurance import Insurance
+
+        cars = db.session.query(
+            Car.id, Car.name, Car.category, Car.seats, Car.price_per_day
+        ).filter(Car.is_active == True).order_by(Car.price_per_day, Car.id).all()
+        insurances = db.session.query(
+            Insurance.id, Insurance.name, Insurance.price_daily
+        ).order_by(Insurance.id).all()
+
+        # floats in the car table become their shortest decimal form, not the binary expansion
+        self.cars = [(row.id, row.name, row.category, row.seats, Decimal(str(row.price_per_day))) for row in cars]
+        self.insurances = [(row.id, row.name, Decimal(row.price_daily)) for row in insurances]
+        self._stamps = stamps
+
+    def cheapest_cars(self, categories, guests):
+        # cars are price ordered, so the first fitting car of each category wins
+        cheapest = {}
+        for car in self.cars:
+            if car[3] >= guests and (categories is None or car[2] in categories) and car[2] not in cheapest:
+                cheapest[car[2]] = car
+        return list(cheapest.values())
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise QuoteError(f'{name} must be YYYY-MM-DD')
+
+
+def _id_list(data, key):
+    value = data.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(item, int) and not isinstance(item, bool) for item in value):
+        raise QuoteError(f'{key} must be a list of ids')
+    return value
+
+
+def build_quotes(data, calendar, tables, max_combinations, max_days):
+    from extensions import db
+    from models.tour import Tour
+
+    guests = data.get('guests', 1)
+    # bool is an int subclass, true would otherwise price one guest
+    if not isinstance(guests, int) or isinstance(guests, bool) or guests < 1:
+        raise QuoteError('guests must be a positive integer')
+
+    tour_ids = _id_list(data, 'tourIds') or []
+    tours = db.session.query(Tour.id, Tour.title, Tour.price, Tour.start_date, Tour.end_date).filter(
+        Tour.id.in_(tour_ids), Tour.is_active == True
+    ).all() if tour_ids else []
+    if len(tours) != len(set(tour_ids)):
+        raise QuoteError('Unknown or inactive tour')
+
+    if data.get('startDate') or data.get('endDate') or len(tours) != 1:
+        start = _parse_date(data.get('startDate'), 'startDate')
+        end = _parse_date(data.get('endDate'), 'endDate')
+    else:
+        start, end = tours[0].start_date, tours[0].end_date
+    if not start or not end or end <= start:
+        raise QuoteError('endDate must be after startDate')
+    if (end - start).days > max_days:
+        raise QuoteError(f'A quote may span at most {max_days} days')
+
+    # absent means every option, an empty list means none of that kind
+    car_ids = _id_list(data, 'carIds')
+    if car_ids is not None:
+        wanted = set(car_ids)
+        cars = [car for car in tables.cars if car[0] in wanted]
+        if len(cars) != len(wanted):
+            raise QuoteError('Unknown or inactive car')
+    else:
+        categories = data.get('carCategories')
+        if categories is not None and (
+            not isinstance(categories, list) or not all(isinstance(item, str) for item in categories)
+        ):
+            raise QuoteError('carCategories must be a list of strings')
+        cars = tables.cheapest_cars(set(categories) if categories is not None else None, guests)
+
+    insurance_ids = _id_list(data, 'insuranceIds')
+    if insurance_ids is not None:
+        wanted = set(insurance_ids)
+        insurances = [plan for plan in tables.insurances if plan[0] in wanted]
+        if len(insurances) != len(wanted):
+            raise QuoteError('Unknown insurance plan')
+    else:
+        insurances = tables.insurances
+
+    combinations = max(len(tours), 1) * max(len(cars), 1) * max(len(insurances), 1)
+    if combinations > max_combinations:
+        raise QuoteError(f'Too many combinations ({combinations} > {max_combinations})')
+
+    factor = calendar.day_factor(start, end)
+
+    # every line is priced and rounded once, the combinations only add rounded lines,
+    # so a total always equals the sum of the lines shown next to it.
+    # tour prices are per person for the tour's own dates and carry no seasonal multiplier
+    tour_lines = [(tour.id, money(Decimal(tour.price) * guests)) for tour in tours] or [(None, Decimal('0'))]
+    car_lines = [(car[0], car[2], money(car[4] * factor)) for car in cars] or [(None, None, Decimal('0'))]
+    insurance_lines = [(plan[0], money(plan[2] * factor * guests)) for plan in insurances] or [(None, Decimal('0'))]
+
+    quotes = [
+        {
+            'tourId': tour_id,
+            'carId': car_id,
+            'carCategory': category,
+            'insuranceId': insurance_id,
+            'tourPrice': float(tour_price),
+            'carPrice': float(car_price),
+            'insurancePrice': float(insurance_price),
+            'total': tour_price + car_price + insurance_price
+        }
+        for (tour_id, tour_price), (car_id, category, car_price), (insurance_id, insurance_price)
+        in itertools.product(tour_lines, car_lines, insurance_lines)
+    ]
+    quotes.sort(key=lambda quote: quote['total'])
+    for quote in quotes:
+        quote['total'] = float(quote['total'])
+
+    return {
+        'startDate': start.isoformat(),
+        'endDate': end.isoformat(),
+        'days': (end - start).days,
+        'guests': guests,
+        'seasonFactor': float(money(factor / (end - start).days)),
+        'quotes': quotes
+    }
+
+
+class QuoteEngine:
+    def __init__(self):
+        self.calendar = SeasonCalendar()
+        self.tables = PriceTables()
+        self.max_combinations = 1000
+        self.max_days = 365
+
+    def init_app(self, app):
+        self.calendar = SeasonCalendar(parse_seasons(app.config['QUOTE_SEASONS']))
+        self.max_combinations = app.config['QUOTE_MAX_COMBINATIONS']
+        self.max_days = app.config['QUOTE_MAX_DAYS']
+
+    def quote(self, data):
+        return build_quotes(data, self.calendar, self.tables.current(), self.max_combinations, self.max_days)
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    def __init__(self, capacity, per_minute, max_keys=100_000):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        # least recently touched first, so refilled and surplus buckets are always at the front
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    # returns seconds until a token is available, 0 when the call is allowed
+    def consume(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            self._buckets.move_to_end(key)
+            self._prune(now)
+            return 0 if allowed else (1 - tokens) / self.rate
+
+    def _prune(self, now):
+        # a refilled bucket is the same as a missing one; past max_keys the oldest go even when not full,
+        # so the dict stays bounded and each call only looks at the buckets it removes plus one
+        full_after = self.capacity / self.rate
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys and now - updated < full_after:
+                break
+            del self._buckets[key]
+
+
+class LoginRateLimiter:
+    def __init__(self):
+        self.by_user = None
+        self.by_ip = None
+
+    def init_app(self, app):
+        config = app.config
+        for name in ('LOGIN_USER_PER_MINUTE', 'LOGIN_IP_PER_MINUTE'):
+            if config[name] <= 0:
+                raise ValueError(f'{name} must be positive, a bucket that never refills locks its key out for good')
+        self.by_user = TokenBucketLimiter(config['LOGIN_USER_BURST'], config['LOGIN_USER_PER_MINUTE'])
+        self.by_ip = TokenBucketLimiter(config['LOGIN_IP_BURST'], config['LOGIN_IP_PER_MINUTE'])
+
+    def check(self, username, ip):
+        wait = self.by_ip.consume(f'ip:{ip}')
+        if username:
+            wait = max(wait, self.by_user.consume(f'user:{username}'))
+        return wait
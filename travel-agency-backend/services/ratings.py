@@ -0,0 +1,156 @@
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import bindparam, case, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+STARS = range(1, 6)
+
+
+def star_column(star):
+    return f'stars_{star}'
+
+
+def average_rating(total, count):
+    if not count:
+        return Decimal('0.0')
+    return (Decimal(total) / count).quantize(Decimal('0.1'), ROUND_HALF_UP)
+
+
+def _bucket(rating):
+    return min(max(rating, 1), 5)
+
+
+def _contribution(tour_id, rating, is_active):
+    # is_active is still None on a new review whose column default has not been applied
+    if tour_id is None or rating is None or is_active is False:
+        return None
+    return tour_id, int(rating)
+
+
+def _previous(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return state.attrs[key].value
+
+
+class ReviewAggregates:
+    def __init__(self):
+        self._listening = False
+
+    def init_app(self, app):
+        if not self._listening:
+            event.listen(Session, 'after_flush', self._apply_flushed)
+            self._listening = True
+
+    def _apply_flushed(self, session, flush_context):
+        from models.review import Review
+
+        deltas = {}
+
+        def add(contribution, sign):
+            if contribution is None:
+                return
+            tour_id, rating = contribution
+            delta = deltas.setdefault(tour_id, Counter())
+            delta['count'] += sign
+            delta['sum'] += sign * rating
+            delta[_bucket(rating)] += sign
+
+        for review in session.new:
+            if isinstance(review, Review):
+                add(_contribution(review.tour_id, review.rating, review.is_active), 1)
+
+        for review in session.deleted:
+            if isinstance(review, Review):
+                state = inspect(review)
+                add(_contribution(*(_previous(state, key) for key in ('tour_id', 'rating', 'is_active'))), -1)
+
+        for review in session.dirty:
+            if not isinstance(review, Review) or not session.is_modified(review):
+                continue
+            state = inspect(review)
+            add(_contribution(*(_previous(state, key) for key in ('tour_id', 'rating', 'is_active'))), -1)
+            add(_contribution(review.tour_id, review.rating, review.is_active), 1)
+
+        deltas = {tour_id: delta for tour_id, delta in deltas.items() if any(delta.values())}
+        if not deltas:
+            return
+
+        connection = session.connection()
+        for tour_id, delta in sorted(deltas.items()):
+            connection.execute(increment_statement(tour_id, delta))
+        session.info.setdefault('changed_tables', set()).add('tours')
+
+
+def increment_statement(tour_id, delta):
+    from models.tour import Tour
+
+    count = Tour.reviews_count + delta['count']
+    total = Tour.rating_sum + delta['sum']
+    # rating goes first: MySQL evaluates SET left to right against already updated columns
+    values = [
+        (Tour.rating, case((count > 0, func.round(total * 1.0 / count, 1)), else_=0)),
+        (Tour.reviews_count, count),
+        (Tour.rating_sum, total),
+    ]
+    values.extend(
+        (getattr(Tour, star_column(star)), getattr(Tour, star_column(star)) + delta[star])
+        for star in STARS if delta[star]
+    )
+    values.append((Tour.updated_at, datetime.utcnow()))
+    return Tour.__table__.update().where(Tour.id == tour_id).ordered_values(*values)
+
+
+def bucket_expression(rating):
+    return case((rating <= 1, 1), (rating >= 5, 5), else_=rating)
+
+
+def compute_aggregates(session):
+    from models.review import Review
+
+    bucket = bucket_expression(Review.rating)
+    query = select(
+        Review.tour_id,
+        func.count(),
+        func.sum(Review.rating),
+        *(func.sum(case((bucket == star, 1), else_=0)) for star in STARS)
+    ).where(Review.is_active.is_(True), Review.tour_id.isnot(None)).group_by(Review.tour_id)
+    return {row[0]: tuple(int(value or 0) for value in row[1:]) for row in session.execute(query)}
+
+
+def reconcile(session, batch_size=1000):
+    from models.tour import Tour
+
+    expected = compute_aggregates(session)
+    empty = (0,) * (2 + len(STARS))
+    star_columns = [getattr(Tour, star_column(star)) for star in STARS]
+    current = session.execute(
+        select(Tour.id, Tour.rating, Tour.reviews_count, Tour.rating_sum, *star_columns)
+    ).yield_per(batch_size)
+
+    fixed = []
+    for tour_id, rating, *stored in current:
+        aggregates = expected.get(tour_id, empty)
+        count, total, *stars = aggregates
+        real_rating = average_rating(total, count)
+        if tuple(value or 0 for value in stored) != aggregates or Decimal(rating or 0) != real_rating:
+            fixed.append({
+                'tour_id': tour_id, 'new_rating': real_rating, 'new_count': count, 'new_sum': total,
+                **{f'new_{star_column(star)}': value for star, value in zip(STARS, stars)}
+            })
+
+    table = Tour.__table__
+    statement = table.update().where(table.c.id == bindparam('tour_id')).values(
+        rating=bindparam('new_rating'),
+        reviews_count=bindparam('new_count'),
+        rating_sum=bindparam('new_sum'),
+        updated_at=datetime.utcnow(),
+        **{star_column(star): bindparam(f'new_{star_column(star)}') for star in STARS}
+    )
+    for start in range(0, len(fixed), batch_size):
+        session.connection().execute(statement, fixed[start:start + batch_size])
+    if fixed:
+        session.info.setdefault('changed_tables', set()).add('tours')
+    return len(fixed)
@@ -0,0 +1,72 @@
+import itertools
+import threading
+from functools import wraps
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_PREFIX = 'replica_'
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.strategy = 'round_robin'
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.strategy = app.config['DB_REPLICA_STRATEGY']
+
+    def choose(self, engines):
+        replicas = [engine for key, engine in engines.items() if key and key.startswith(REPLICA_PREFIX)]
+        if not replicas:
+            return None
+        if self.strategy == 'least_loaded':
+            return min(replicas, key=lambda engine: engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else 0)
+        with self._lock:
+            position = next(self._counter)
+        return replicas[position % len(replicas)]
+
+
+replica_router = ReplicaRouter()
+
+
+def replica_reads(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._can_use_replica(clause):
+            replica = self.info.get('replica')
+            if replica is None:
+                replica = replica_router.choose(self._db.engines)
+                self.info['replica'] = replica
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_replica(self, clause):
+        if self._flushing or self.info.get('wrote'):
+            return False
+        if not has_app_context() or not g.get('replica_reads'):
+            return False
+        if isinstance(clause, UpdateBase) or getattr(clause, '_for_update_arg', None) is not None:
+            return False
+        return True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_dml(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['wrote'] = True
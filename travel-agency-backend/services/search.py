@@ -0,0 +1,126 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+# characters that NFKD does not decompose into base letter + accent
+_EXTRA_FOLDS = str.maketrans({'ł': 'l', 'Ł': 'l', 'ø': 'o', 'Ø': 'o', 'ß': 'ss', 'đ': 'd', 'Đ': 'd'})
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    if not text:
+        return ''
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text.translate(_EXTRA_FOLDS))
+    return text.encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class TourSearchIndex:
+    FIELD_WEIGHTS = {
+        'title': 3.0,
+        'location': 2.0,
+        'region': 1.0,
+        'description': 0.5
+    }
+    EXACT_BONUS = 1.5
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._postings = defaultdict(dict)
+        self._doc_tokens = {}
+        self._vocabulary = []
+        self._stamp = None
+
+    def ensure_fresh(self):
+        # the tour table version moves on every create, update, delete and bulk import, in this worker or
+        # any other, so each worker rebuilds on its next search; production startup skips the eager build
+        from models.tour import Tour
+        from utils.conditional import table_stamp
+
+        stamp = table_stamp(Tour)
+        if stamp != self._stamp:
+            with self._refresh_lock:
+                if stamp != self._stamp:
+                    self.rebuild(stamp)
+
+    def rebuild(self, stamp=None):
+        from models.tour import Tour
+        from utils.conditional import table_stamp
+
+        # read before the rows, so a write landing in between leaves the index one version behind, not ahead
+        if stamp is None:
+            stamp = table_stamp(Tour)
+        rows = Tour.query.with_entities(
+            Tour.id, Tour.title, Tour.location, Tour.region, Tour.description
+        ).yield_per(1000)
+        self.build(rows)
+        self._stamp = stamp
+
+    def build(self, rows):
+        postings = defaultdict(dict)
+        doc_tokens = {}
+        for row in rows:
+            weights = self._weigh(row)
+            doc_tokens[row.id] = weights
+            for token, weight in weights.items():
+                postings[token][row.id] = weight
+
+        with self._lock:
+            self._postings = postings
+            self._doc_tokens = doc_tokens
+            self._vocabulary = sorted(postings)
+
+    def search(self, text, limit=None):
+        terms = tokenize(text)
+        if not terms:
+            return []
+
+        self.ensure_fresh()
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = self._match_prefix(term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        tour_id: score + term_scores[tour_id]
+                        for tour_id, score in scores.items()
+                        if tour_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+        ranked = sorted(scores, key=lambda tour_id: (-scores[tour_id], tour_id))
+        return ranked[:limit] if limit else ranked
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def _match_prefix(self, term):
+        scores = {}
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary):
+            token = self._vocabulary[position]
+            if not token.startswith(term):
+                break
+            bonus = self.EXACT_BONUS if token == term else 1.0
+            for tour_id, weight in self._postings[token].items():
+                scores[tour_id] = max(scores.get(tour_id, 0.0), weight * bonus)
+            position += 1
+        return scores
+
+    def _weigh(self, tour):
+        weights = {}
+        for field, field_weight in self.FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(tour, field, None)):
+                weights[token] = weights.get(token, 0.0) + field_weight
+        return weights
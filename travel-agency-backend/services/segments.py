@@ -0,0 +1,105 @@
+import re
+from sqlalchemy import and_, func, not_, or_, select
+from models.newsletter import Newsletter
+from models.newsletter_interest import NewsletterInterest
+
+_TOKEN_RE = re.compile(r'\(|\)|[^\s()]+')
+MAX_TERMS = 20
+# NOTs and parentheses nest by recursion, so their depth is capped well below the interpreter's limit
+MAX_DEPTH = 20
+
+
+class SegmentError(ValueError):
+    pass
+
+
+class SegmentParser:
+    # "asia AND (diving OR surfing) NOT cruises": NOT binds tightest, then AND (also implied
+    # between neighbours), then OR; each interest becomes one lookup on the interest index
+    def __init__(self, text):
+        self.tokens = _TOKEN_RE.findall(text or '')
+        self.position = 0
+        self.terms = []
+        self.depth = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise SegmentError('Empty segment query')
+        criteria = self._or()
+        if self.position < len(self.tokens):
+            raise SegmentError(f'Unexpected {self.tokens[self.position]!r}')
+        return criteria
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position].upper()
+        return None
+
+    def _next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _or(self):
+        parts = [self._and()]
+        while self._peek() == 'OR':
+            self._next()
+            parts.append(self._and())
+        return parts[0] if len(parts) == 1 else or_(*parts)
+
+    def _and(self):
+        parts = [self._not()]
+        while self._peek() not in (None, 'OR', ')'):
+            if self._peek() == 'AND':
+                self._next()
+            parts.append(self._not())
+        return parts[0] if len(parts) == 1 else and_(*parts)
+
+    def _not(self):
+        if self._peek() == 'NOT':
+            self._next()
+            self._enter()
+            criteria = not_(self._not())
+            self.depth -= 1
+            return criteria
+        return self._atom()
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise SegmentError(f'At most {MAX_DEPTH} nested NOTs and parentheses per segment')
+
+    def _atom(self):
+        token = self._peek()
+        if token is None:
+            raise SegmentError('Unexpected end of segment query')
+        if token == '(':
+            self._next()
+            self._enter()
+            criteria = self._or()
+            if self._peek() != ')':
+                raise SegmentError('Missing )')
+            self._next()
+            self.depth -= 1
+            return criteria
+        if token in ('AND', 'OR', ')'):
+            raise SegmentError(f'Unexpected {self._next()!r}')
+
+        interest = self._next().lower()
+        self.terms.append(interest)
+        if len(self.terms) > MAX_TERMS:
+            raise SegmentError(f'At most {MAX_TERMS} interests per segment')
+        return Newsletter.id.in_(
+            select(NewsletterInterest.newsletter_id).where(NewsletterInterest.interest == interest)
+        )
+
+
+def segment_filter(text):
+    parser = SegmentParser(text)
+    return parser.parse(), parser.terms
+
+
+def interest_count_statement(terms):
+    return select(NewsletterInterest.interest, func.count()).where(
+        NewsletterInterest.interest.in_(terms)
+    ).group_by(NewsletterInterest.interest)
@@ -0,0 +1,64 @@
+from datetime import datetime
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+class TableVersions:
+    # a version per table, read by one primary key lookup instead of COUNT/MAX over the table.
+    # writers report what they touched in session.info['changed_tables'] (the response cache collects
+    # ORM flushes and Core statements, Core writers add their tables); the bump is part of the commit
+    def __init__(self):
+        self.tables = set()
+        self._listening = False
+
+    def init_app(self, app):
+        if not self._listening:
+            event.listen(Session, 'before_commit', self._bump_changed)
+            event.listen(Session, 'after_commit', _forget_stamps)
+            self._listening = True
+
+    def track(self, *models):
+        # only tables something reads a stamp of are bumped, hot write-only tables never take the row lock
+        self.tables.update(model.__tablename__ for model in models)
+
+    def _bump_changed(self, session):
+        # pending objects are flushed first, so their tables (and what after_flush listeners add) are known
+        session.flush()
+        tables = self.tables & session.info.get('changed_tables', set())
+        if not tables:
+            return
+        connection = session.connection()
+        now = datetime.utcnow()
+        # rows are touched in name order so concurrent writers lock them in the same order
+        for name in sorted(tables):
+            bump(connection, name, now)
+
+
+def bump(connection, name, now):
+    from models.table_version import TableVersion
+
+    table = TableVersion.__table__
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(table).values(name=name, version=1, updated_at=now)
+        connection.execute(statement.on_duplicate_key_update(version=table.c.version + 1, updated_at=now))
+    elif dialect == 'sqlite':
+        statement = sqlite_insert(table).values(name=name, version=1, updated_at=now)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=['name'], set_={'version': table.c.version + 1, 'updated_at': now}
+        ))
+    else:
+        result = connection.execute(
+            table.update().where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(name=name, version=1, updated_at=now))
+
+
+def _forget_stamps(session):
+    # stamps read earlier in this request are stale once its own write committed
+    if has_app_context():
+        g.pop('table_stamps', None)
@@ -0,0 +1,144 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask_jwt_extended import JWTManager
+
+
+class CachingJWTManager(JWTManager):
+    # remembers successfully verified tokens until their exp claim, keyed by token hash;
+    # type, freshness and blocklist checks still run on every request
+    def __init__(self, app=None, max_entries=10_000):
+        self.max_entries = max_entries
+        self._verified = OrderedDict()
+        self._verified_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        super().__init__(app)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        self.max_entries = app.config['JWT_VERIFIED_CACHE_SIZE']
+        with self._verified_lock:
+            self._verified.clear()
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.sha256(encoded_token.encode()).digest()
+        now = time.time()
+        with self._verified_lock:
+            entry = self._verified.get(key)
+            if entry is not None and entry[0] > now:
+                self._verified.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            self._verified.pop(key, None)
+
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        with self._verified_lock:
+            self.misses += 1
+            self._verified[key] = (claims.get('exp', now), dict(claims))
+            while len(self._verified) > self.max_entries:
+                self._verified.popitem(last=False)
+        return claims
+
+    def cache_stats(self):
+        return {'entries': len(self._verified), 'hits': self.hits, 'misses': self.misses}
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class TokenBlocklist:
+    # revoked jti -> exp; the bloom filter answers the common "not revoked" case without touching the set.
+    # the set lives in this process only, which short-lived access tokens can afford; refresh tokens live
+    # for weeks, so their revocations are also stored in revoked_token and checked there by /refresh
+    def __init__(self):
+        self.capacity = 100_000
+        self.error_rate = 0.01
+        self._revoked = {}
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.capacity = app.config['JWT_BLOCKLIST_CAPACITY']
+        self.error_rate = app.config['JWT_BLOCKLIST_ERROR_RATE']
+        with self._lock:
+            self._revoked = {}
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            if len(self._revoked) >= self.capacity:
+                self._rebuild(time.time())
+            self._revoked[jti] = expires_at
+            self._filter.add(jti)
+
+    def revoke_refresh(self, jti, expires_at):
+        from sqlalchemy.exc import IntegrityError
+        from extensions import db
+        from models.revoked_token import RevokedToken
+
+        self.revoke(jti, expires_at)
+        now = datetime.utcnow()
+        # expired rows fail verification anyway; logouts are rare enough to clear them as they go
+        RevokedToken.query.filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        if db.session.get(RevokedToken, jti) is None:
+            db.session.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at)))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # the same token logged out in another worker at the same moment
+            db.session.rollback()
+
+    def is_revoked(self, jti):
+        if jti not in self._filter:
+            return False
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def check(self, jwt_header, jwt_payload):
+        if self.is_revoked(jwt_payload['jti']):
+            return True
+        # refresh tokens are only accepted by /refresh, so only that route reads the table
+        return jwt_payload.get('type') == 'refresh' and self._stored(jwt_payload['jti'])
+
+    def stats(self):
+        return {'revoked': len(self._revoked), 'capacity': self.capacity}
+
+    def _stored(self, jti):
+        from extensions import db
+        from models.revoked_token import RevokedToken
+
+        return db.session.get(RevokedToken, jti) is not None
+
+    def _rebuild(self, now):
+        # expired tokens fail verification anyway, so they can leave the list; live ones never can.
+        # when fewer than half expired the capacity doubles, so the next rebuild is at least as many
+        # revokes away as this one cost and a logout stays O(1) amortized
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        if len(self._revoked) * 2 > self.capacity:
+            self.capacity *= 2
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._revoked:
+            self._filter.add(jti)
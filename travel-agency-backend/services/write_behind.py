@@ -0,0 +1,273 @@
+import atexit
+import fcntl
+import itertools
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from sqlalchemy import exc
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolSegment:
+    # an append-only ndjson file, flock-ed for as long as this process owns it
+    def __init__(self, path, handle):
+        self.path = path
+        self.handle = handle
+
+    @classmethod
+    def create(cls, path):
+        handle = open(path, 'a+', encoding='utf-8')
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return cls(path, handle)
+
+    @classmethod
+    def claim(cls, path):
+        try:
+            handle = open(path, 'r+', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return None
+        if os.fstat(handle.fileno()).st_nlink == 0:
+            # flushed and deleted by another process while we waited for the lock
+            handle.close()
+            return None
+        return cls(path, handle)
+
+    def append(self, line, fsync):
+        self.handle.write(line)
+        self.handle.flush()
+        if fsync:
+            os.fsync(self.handle.fileno())
+
+    def read(self):
+        self.handle.seek(0)
+        entries = []
+        for line in self.handle:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning('Skipping truncated spool line in %s', self.path)
+        return entries
+
+    def discard(self):
+        os.remove(self.path)
+        self.handle.close()
+
+
+class WriteBehindQueue:
+    def __init__(self):
+        self.enabled = False
+        self._handlers = {}
+        self._app = None
+        self._pending = []
+        self._segments = []
+        self._active = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._sequence = itertools.count()
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+
+    def init_app(self, app):
+        self.enabled = app.config['WRITE_BEHIND_ENABLED']
+        self.flush_interval = app.config['WRITE_BEHIND_FLUSH_MS'] / 1000
+        self.batch_size = app.config['WRITE_BEHIND_BATCH_SIZE']
+        self.spool_dir = app.config['WRITE_BEHIND_SPOOL_DIR']
+        self.fsync = app.config['WRITE_BEHIND_FSYNC']
+        self._app = app
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def submit(self, kind, row):
+        self.start()
+        entry = {'kind': kind, 'row': row}
+        line = json.dumps(entry, default=_encode) + '\n'
+        with self._lock:
+            self._active.append(line, self.fsync)
+            self._pending.append(entry)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, []
+                segments = self._segments + [self._active]
+                self._segments = []
+                self._active = self._new_segment()
+
+            written, dead, remaining = self._write(batch)
+            if dead:
+                self._dead_letter(dead)
+
+            if remaining and not written and not dead:
+                # nothing changed, the batch goes back as it is together with its spool segments
+                with self._lock:
+                    self._pending = batch + self._pending
+                    self._segments = segments + self._segments
+                    self.failed_flushes += 1
+                return 0
+
+            if remaining:
+                # part of the batch is in the database now; only the rest may be replayed after a crash
+                with self._lock:
+                    for entry in remaining:
+                        self._active.append(json.dumps(entry, default=_encode) + '\n', self.fsync)
+                    self._pending = remaining + self._pending
+                    self.failed_flushes += 1
+            for segment in segments:
+                segment.discard()
+            self.flushed += written
+            return written
+
+    def _write(self, batch):
+        # returns (rows written, [(entry, error)] that failed for good, entries left for the next flush).
+        # a failing chunk is halved until the rows that fail on their own are isolated, so one bad row
+        # cannot hold back the rest; a transient error (connection, lock) stops here and is retried later
+        written, dead = 0, []
+        chunks = [batch]
+        while chunks:
+            chunk = chunks.pop()
+            try:
+                self._commit(chunk)
+            except Exception as e:
+                if is_transient(e):
+                    logger.warning('Write-behind flush of %d rows failed, will retry: %s', len(batch), e)
+                    return written, dead, [entry for part in [chunk, *reversed(chunks)] for entry in part]
+                if len(chunk) == 1:
+                    dead.append((chunk[0], e))
+                else:
+                    middle = len(chunk) // 2
+                    chunks += [chunk[middle:], chunk[:middle]]
+                continue
+            written += len(chunk)
+        return written, dead, []
+
+    def _commit(self, entries):
+        with self._app.app_context():
+            from extensions import db
+
+            try:
+                for kind, rows in _group(entries).items():
+                    # handlers may normalize rows in place, a retried half must see the spooled values
+                    self._handlers[kind]([dict(row) for row in rows])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _dead_letter(self, failures):
+        # kept beside the spool but never replayed; fix the data and resubmit by hand
+        path = os.path.join(self.spool_dir, f'dead-letter-{os.getpid()}.jsonl')
+        with open(path, 'a', encoding='utf-8') as handle:
+            for entry, error in failures:
+                logger.error('Write-behind %s row rejected, moved to %s: %s', entry['kind'], path, error)
+                handle.write(json.dumps({**entry, 'error': str(error)}, default=_encode) + '\n')
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+        self.dead_lettered += len(failures)
+
+    def shutdown(self):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        with self._lock:
+            if not self._pending:
+                self._active.discard()
+                self._pid = None
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'pending': len(self._pending),
+            'flushed': self.flushed,
+            'failedFlushes': self.failed_flushes,
+            'deadLettered': self.dead_lettered
+        }
+
+    def start(self):
+        # threads and flocks do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._pending, self._segments = [], []
+            self._pid = os.getpid()
+            self._active = self._new_segment()
+            self._recover_orphans()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def _recover_orphans(self):
+        for name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, name)
+            if not name.endswith('.ndjson') or path == self._active.path:
+                continue
+            segment = SpoolSegment.claim(path)
+            if segment is None:
+                continue
+            entries = segment.read()
+            self._pending.extend(entries)
+            self._segments.append(segment)
+            logger.info('Recovered %d spooled writes from %s', len(entries), path)
+
+    def _new_segment(self):
+        name = f'spool-{os.getpid()}-{next(self._sequence)}.ndjson'
+        return SpoolSegment.create(os.path.join(self.spool_dir, name))
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def parse_timestamp(value):
+    # rows replayed from the spool carry ISO strings instead of datetimes
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def is_transient(error):
+    # lost connections, pool timeouts, lock waits and deadlocks; constraint and data errors are not
+    if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (exc.OperationalError, exc.InterfaceError, exc.DisconnectionError, exc.TimeoutError))
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _group(entries):
+    grouped = {}
+    for entry in entries:
+        grouped.setdefault(entry['kind'], []).append(entry['row'])
+    return grouped
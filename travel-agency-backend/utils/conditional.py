@@ -0,0 +1,62 @@
+import hashlib
+from functools import wraps
+from flask import current_app, g, has_app_context, make_response, request
+from sqlalchemy import select
+from extensions import db, table_versions
+from models.table_version import TableVersion
+
+
+def stamp_statement(model):
+    table_versions.track(model)
+    return select(TableVersion.version, TableVersion.updated_at).where(TableVersion.name == model.__tablename__)
+
+
+def stamp_of(row):
+    # a table nobody has written to since versions were introduced has no row yet
+    return (row[0], row[1]) if row else (0, None)
+
+
+def table_stamp(model):
+    # (version, last modified); read once per request, so the conditional check and the in-memory
+    # indexes behind a view share one lookup
+    stamps = g.setdefault('table_stamps', {}) if has_app_context() else {}
+    if model.__tablename__ not in stamps:
+        stamps[model.__tablename__] = stamp_of(db.session.execute(stamp_statement(model)).first())
+    return stamps[model.__tablename__]
+
+
+def stamp_etag(full_path, stamps):
+    fingerprint = f'{full_path}|{stamps!r}'
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def last_modified_of(stamps):
+    modified = [last_modified for _, last_modified in stamps if last_modified]
+    return max(modified) if modified else None
+
+
+def conditional(*models):
+    # tracked when the route is declared, so every worker bumps these tables whether or not it served a read
+    table_versions.track(*models)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            stamps = [table_stamp(model) for model in models]
+            last_modified = last_modified_of(stamps)
+            etag = stamp_etag(request.full_path, stamps)
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from flask import Response, current_app, jsonify, request, stream_with_context
+from extensions import db
+from utils.pagination import PaginationError, parse_fields
+from utils.serialization import api_columns, row_serializer
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ','.join(value)
+    return value
+
+
+def _ndjson_chunks(rows, to_dict, fields):
+    for partition in rows.partitions():
+        yield ''.join(
+            json.dumps(to_dict(row), ensure_ascii=False, default=str) + '\n'
+            for row in partition
+        )
+
+
+def _csv_chunks(rows, to_dict, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for partition in rows.partitions():
+        for row in partition:
+            item = to_dict(row)
+            writer.writerow([_csv_value(item[name]) for name in fields])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(model, filename, filters=(), default_fields=None):
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'error': f'Unsupported format: {export_format}'}), 400
+
+    try:
+        fields = parse_fields(model.API_FIELDS, request.args.get('fields')) or default_fields or list(model.API_FIELDS)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    statement = db.select(*api_columns(model, fields)).where(*filters).order_by(model.id).execution_options(
+        stream_results=True,
+        yield_per=current_app.config['EXPORT_BATCH_SIZE']
+    )
+
+    chunks = _csv_chunks if export_format == 'csv' else _ndjson_chunks
+    to_dict = row_serializer(model, tuple(fields))
+
+    def generate():
+        rows = db.session.execute(statement)
+        try:
+            yield from chunks(rows, to_dict, fields)
+        finally:
+            rows.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+    )
@@ -0,0 +1,141 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app, jsonify, request
+from sqlalchemy import and_, or_
+from utils.serialization import api_columns, row_serializer
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_column):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None:
+            python_type = sort_column.type.python_type
+            if python_type is datetime:
+                sort_value = datetime.fromisoformat(sort_value)
+            elif python_type is date:
+                sort_value = date.fromisoformat(sort_value)
+            else:
+                sort_value = python_type(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise PaginationError('Invalid cursor')
+
+
+def parse_fields(api_fields, raw):
+    if not raw:
+        return None
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in api_fields]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def apply_keyset(query, sort_column, id_column, after, descending=False):
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if after is None:
+        return query
+
+    # NULLs sort first ascending and last descending (MySQL and SQLite)
+    sort_value, last_id = after
+    if descending:
+        if sort_value is None:
+            condition = and_(sort_column.is_(None), id_column < last_id)
+        else:
+            condition = or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < last_id),
+                sort_column.is_(None)
+            )
+    else:
+        if sort_value is None:
+            condition = or_(
+                and_(sort_column.is_(None), id_column > last_id),
+                sort_column.isnot(None)
+            )
+        else:
+            condition = or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > last_id)
+            )
+    return query.filter(condition)
+
+
+class PageRequest:
+    def __init__(self, paged, fields, after, limit):
+        self.paged = paged
+        self.fields = fields
+        self.after = after
+        self.limit = limit
+
+
+# admin lists always page, so a client that sends neither limit nor cursor still gets DEFAULT_PAGE_SIZE rows;
+# public lists keep the plain array unless a page is asked for
+def page_request(model, sort_column, args, always_paged=False):
+    try:
+        fields = parse_fields(model.API_FIELDS, args.get('fields'))
+        after = decode_cursor(args['cursor'], sort_column) if args.get('cursor') else None
+        limit = args.get('limit', current_app.config['DEFAULT_PAGE_SIZE'], type=int)
+    except (ValueError, TypeError) as e:
+        raise PaginationError(str(e))
+    limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+    return PageRequest(always_paged or 'limit' in args or 'cursor' in args, fields, after, limit)
+
+
+def page_columns(model, sort_column, page):
+    return [*api_columns(model, page.fields), sort_column, model.id]
+
+
+def page_body(rows, model, page):
+    to_dict = row_serializer(model, tuple(page.fields) if page.fields else None)
+    if not page.paged:
+        return [to_dict(row) for row in rows]
+
+    rows = list(rows)
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+
+    return {
+        'items': [to_dict(row) for row in rows],
+        'nextCursor': next_cursor
+    }
+
+
+# works for legacy Query objects and 2.0 select() statements alike
+def paginate_statement(statement, model, sort_column, page, descending=False):
+    statement = apply_keyset(statement, sort_column, model.id, page.after, descending)
+    if page.paged:
+        statement = statement.limit(page.limit + 1)
+    return statement
+
+
+def paginated_response(query, model, sort_column, descending=False, always_paged=False):
+    try:
+        page = page_request(model, sort_column, request.args, always_paged)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = query.with_entities(*page_columns(model, sort_column, page))
+    query = paginate_statement(query, model, sort_column, page, descending)
+    return jsonify(page_body(query, model, page))
@@ -0,0 +1,53 @@
+from functools import lru_cache
+
+
+def to_float(value):
+    return float(value) if value is not None else None
+
+
+def iso_format(value):
+    return value.isoformat() if value else None
+
+
+def minute_format(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else None
+
+
+def split_list(value):
+    return value.split(',') if value else []
+
+
+def serialize(source, api_fields, only=None):
+    result = {}
+    for name in only or api_fields:
+        attribute, convert = api_fields[name]
+        value = getattr(source, attribute)
+        result[name] = convert(value) if convert else value
+    return result
+
+
+def api_columns(model, fields=None):
+    return [getattr(model, model.API_FIELDS[name][0]) for name in fields or model.API_FIELDS]
+
+
+# rows must be selected with api_columns(); extra trailing columns (e.g. pagination keys) are ignored
+@lru_cache(maxsize=None)
+def row_serializer(model, fields=None):
+    api_fields = model.API_FIELDS
+    names = fields or tuple(api_fields)
+    plain = [(name, index) for index, name in enumerate(names) if api_fields[name][1] is None]
+    converted = [(name, index, api_fields[name][1]) for index, name in enumerate(names) if api_fields[name][1]]
+
+    def serialize_row(row):
+        result = {name: row[index] for name, index in plain}
+        for name, index, convert in converted:
+            result[name] = convert(row[index])
+        return result
+
+    return serialize_row
+
+
+def serialize_query(query, model, fields=None):
+    fields = tuple(fields) if fields else None
+    to_dict = row_serializer(model, fields)
+    return [to_dict(row) for row in query.with_entities(*api_columns(model, fields))]
@@ -40,11 +40,14 @@ interface Inquiry {
 export function InquiriesManager() {
   const [inquiries, setInquiries] = useState<Inquiry[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const fetchInquiries = async () => {
     try {
-      const data = await api.get("/inquiries");
-      setInquiries(data);
+      const page = await api.getPage("/inquiries");
+      setInquiries(page.items);
+      setNextCursor(page.nextCursor);
     } catch (e) {
       toast.error("Failed to load inquiries");
     } finally {
@@ -52,6 +55,20 @@ export function InquiriesManager() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await api.getPage("/inquiries", nextCursor);
+      setInquiries((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      toast.error("Failed to load inquiries");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchInquiries();
   }, []);
@@ -205,6 +222,14 @@ export function InquiriesManager() {
             )}
           </TableBody>
         </Table>
+        {nextCursor && (
+          <div className="flex justify-center p-4 border-t">
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -23,12 +23,15 @@ interface Subscriber {
 export function NewsletterManager() {
   const [subscribers, setSubscribers] = useState<Subscriber[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const fetchSubscribers = async () => {
     try {
       setIsLoading(true);
-      const data = await api.get("/newsletter");
-      setSubscribers(data);
+      const page = await api.getPage("/newsletter");
+      setSubscribers(page.items);
+      setNextCursor(page.nextCursor);
     } catch (e) {
       toast.error("Failed to fetch subscribers");
     } finally {
@@ -36,6 +39,20 @@ export function NewsletterManager() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await api.getPage("/newsletter", nextCursor);
+      setSubscribers((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      toast.error("Failed to fetch subscribers");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchSubscribers();
   }, []);
@@ -129,6 +146,14 @@ export function NewsletterManager() {
             )}
           </TableBody>
         </Table>
+        {nextCursor && (
+          <div className="flex justify-center p-4 border-t">
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
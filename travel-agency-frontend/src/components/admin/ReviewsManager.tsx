@@ -20,7 +20,7 @@ import {
   DialogTitle,
   DialogTrigger,
 } from "../ui/dialog";
-import { Trash2, Plus, Star, Edit } from "lucide-react";
+import { Trash2, Plus, Star, Edit, Loader2 } from "lucide-react";
 import { toast } from "sonner";
 
 interface Review {
@@ -37,6 +37,8 @@ export function ReviewsManager() {
   const [reviews, setReviews] = useState<Review[]>([]);
   const [isOpen, setIsOpen] = useState(false);
   const [editingId, setEditingId] = useState<number | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const [formData, setFormData] = useState({
     username: "",
@@ -49,13 +51,28 @@ export function ReviewsManager() {
 
   const fetchReviews = async () => {
     try {
-      const data = await api.get("/reviews?admin=true");
-      setReviews(data);
+      const page = await api.getPage("/reviews?admin=true");
+      setReviews(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       toast.error("Failed to load reviews");
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await api.getPage("/reviews?admin=true", nextCursor);
+      setReviews((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      toast.error("Failed to load reviews");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchReviews();
   }, []);
@@ -283,6 +300,14 @@ export function ReviewsManager() {
             ))}
           </TableBody>
         </Table>
+        {nextCursor && (
+          <div className="flex justify-center p-4 border-t">
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,5 +1,10 @@
 const BASE_URL = '/api'; 
 
+export interface Page<T = any> {
+  items: T[];
+  nextCursor: string | null;
+}
+
 export const api = {
   get: async (endpoint: string) => {
     const res = await fetch(`${BASE_URL}${endpoint}`, {
@@ -9,6 +14,13 @@ export const api = {
     return res.json();
   },
 
+  // admin lists answer one page at a time: { items, nextCursor }, nextCursor is null on the last page
+  getPage: async (endpoint: string, cursor?: string | null): Promise<Page> => {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const query = cursor ? `${separator}cursor=${encodeURIComponent(cursor)}` : '';
+    return api.get(`${endpoint}${query}`);
+  },
+
   post: async (endpoint: string, data: any) => {
     const res = await fetch(`${BASE_URL}${endpoint}`, {
       method: 'POST',